@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for `filter_datum` and `RedactingFormatter.format`.
+
+Both are measured over a matrix of message lengths, redacted field counts,
+separators and shares of matching fields, next to a no-redaction baseline
+(an identity function and a plain `logging.Formatter` with the same format).
+Results are written as JSON so they can be compared between releases.
+
+Usage:
+    python3 benchmark.py [--output results.json] [--repeat 5] [--quick]
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import platform
+import sys
+import timeit
+import tracemalloc
+from typing import Callable, Dict, List
+
+from filtered_logger import RedactingFormatter, filter_datum
+
+MESSAGE_LENGTHS = (4, 16, 64, 256)
+FIELD_COUNTS = (1, 5, 20)
+SEPARATORS = (";", "|")
+MATCH_SHARES = (0.0, 0.25, 1.0)
+
+
+def build_case(length: int, field_count: int, separator: str,
+               match_share: float) -> Dict:
+    """
+    Builds the fields and message of one benchmark case.
+
+    Args:
+        length (int): The number of field-value pairs in the message.
+        field_count (int): The number of fields to redact.
+        separator (str): The character separating field-value pairs.
+        match_share (float): The share of pairs that are redacted fields.
+
+    Returns:
+        Dict: The `fields` list and the `message` string.
+    """
+    fields = ["pii{}".format(index) for index in range(field_count)]
+    matching = int(round(length * match_share))
+    pairs = []
+    for index in range(length):
+        name = (fields[index % field_count] if index < matching
+                else "field{}".format(index))
+        pairs.append("{}=value{}{}".format(name, index, separator))
+    return {'fields': fields, 'message': "".join(pairs)}
+
+
+def measure(func: Callable[[], object], repeat: int) -> Dict:
+    """
+    Times a callable and measures its memory allocations.
+
+    Args:
+        func (Callable): The operation to measure, called without arguments.
+        repeat (int): The number of timing runs; the best one is kept.
+
+    Returns:
+        Dict: `ops_per_sec`, `ns_per_record` and `alloc_bytes` (the peak
+        memory allocated by a single call).
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+    tracemalloc.start()
+    try:
+        func()
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'ops_per_sec': 1.0 / best,
+        'ns_per_record': best * 1e9,
+        'alloc_bytes': peak - baseline,
+    }
+
+
+def bench_case(case: Dict, separator: str, repeat: int) -> List[Dict]:
+    """
+    Runs every benchmark target on one case.
+
+    Args:
+        case (Dict): A case built by `build_case`.
+        separator (str): The separator of the case's message.
+        repeat (int): See `measure`.
+
+    Returns:
+        List[Dict]: One result per target.
+    """
+    fields, message = case['fields'], case['message']
+    record = logging.LogRecord("user_data", logging.INFO, __file__, 0,
+                               message, None, None)
+    plain = logging.Formatter(RedactingFormatter.FORMAT)
+
+    class Formatter(RedactingFormatter):
+        SEPARATOR = separator
+
+    redacting = Formatter(fields=fields)
+
+    def format_fresh(formatter: logging.Formatter) -> Callable[[], str]:
+        """ Formats a new record each call, as a logger would """
+        def run() -> str:
+            return formatter.format(logging.LogRecord(
+                "user_data", logging.INFO, __file__, 0, message, None, None))
+        return run
+
+    targets = {
+        'baseline_identity': lambda: str(message),
+        'filter_datum': lambda: filter_datum(fields, "***", message,
+                                             separator),
+        'baseline_formatter': format_fresh(plain),
+        'redacting_formatter': format_fresh(redacting),
+        'redacting_formatter_cached': lambda: redacting.format(record),
+    }
+    return [dict(target=name, **measure(func, repeat))
+            for name, func in targets.items()]
+
+
+def run(repeat: int, quick: bool) -> Dict:
+    """
+    Runs the whole benchmark matrix.
+
+    Args:
+        repeat (int): See `measure`.
+        quick (bool): Whether to only run the smallest matrix.
+
+    Returns:
+        Dict: The environment description and the list of results.
+    """
+    lengths = MESSAGE_LENGTHS[:2] if quick else MESSAGE_LENGTHS
+    counts = FIELD_COUNTS[:2] if quick else FIELD_COUNTS
+    results = []
+    for length, count, separator, share in itertools.product(
+            lengths, counts, SEPARATORS, MATCH_SHARES):
+        case = build_case(length, count, separator, share)
+        params = {'message_length': length,
+                  'message_bytes': len(case['message']),
+                  'field_count': count, 'separator': separator,
+                  'match_share': share}
+        for result in bench_case(case, separator, repeat):
+            results.append(dict(params, **result))
+            print("{target:28} len={message_length:<4} fields={field_count:<3}"
+                  " sep={separator} match={match_share:<4} "
+                  "{ns_per_record:10.0f} ns/record".format(**results[-1]),
+                  file=sys.stderr)
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--output', default=None,
+                        help="JSON file to write, stdout by default")
+    parser.add_argument('--repeat', type=int, default=5,
+                        help="timing runs per case; the best one is kept")
+    parser.add_argument('--quick', action='store_true',
+                        help="only run a reduced matrix")
+    args = parser.parse_args()
+    report = run(args.repeat, args.quick)
+    if args.output is None:
+        json.dump(report, sys.stdout, indent=2)
+    else:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Import-time budget check for `filtered_logger`.
+
+The module is imported in fresh interpreters with `-X importtime`, and the
+best cumulative import time is compared with the budget. Bytecode caching is
+forced on, as in a deployed install, so compilation is not measured. The
+check also fails if importing the module loads any dependency that must
+stay lazy.
+
+Usage:
+    python3 check_import_time.py [--budget-ms 50] [--runs 5]
+
+Exits with status 1 when the budget is exceeded.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import Tuple
+
+MODULE = "filtered_logger"
+IMPORT_TIME_BUDGET_MS = 50.0
+LAZY_MODULES = ("mysql", "bcrypt", "concurrent.futures", "argparse",
+                "asyncio")
+
+
+def measure_import(module: str = MODULE) -> Tuple[float, list]:
+    """
+    Imports a module in a fresh interpreter and measures it.
+
+    Args:
+        module (str): The module to import.
+
+    Returns:
+        Tuple[float, list]: The cumulative import time in milliseconds, and
+        the LAZY_MODULES that the import loaded.
+    """
+    code = ("import sys, {0}; print(','.join(m for m in {1!r} "
+            "if m in sys.modules))").format(module, LAZY_MODULES)
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+        capture_output=True, text=True, check=True)
+    cumulative_us = None
+    for line in result.stderr.splitlines():
+        parts = [part.strip() for part in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            cumulative_us = int(parts[1])
+    loaded = [name for name in result.stdout.strip().split(",") if name]
+    return cumulative_us / 1000.0, loaded
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--budget-ms', type=float,
+                        default=IMPORT_TIME_BUDGET_MS,
+                        help="maximum import time in milliseconds")
+    parser.add_argument('--runs', type=int, default=5,
+                        help="number of imports; the fastest one is kept")
+    args = parser.parse_args()
+
+    # The first import only warms the bytecode cache
+    measure_import()
+    runs = [measure_import() for _ in range(args.runs)]
+    best = min(elapsed for elapsed, _ in runs)
+    loaded = sorted({name for _, names in runs for name in names})
+    print("{}: {:.1f} ms (budget {:.1f} ms)".format(MODULE, best,
+                                                    args.budget_ms))
+    failed = False
+    if best > args.budget_ms:
+        print("import time budget exceeded", file=sys.stderr)
+        failed = True
+    if loaded:
+        print("eagerly imported: {}".format(", ".join(loaded)),
+              file=sys.stderr)
+        failed = True
+    sys.exit(1 if failed else 0)
@@ -7,16 +7,369 @@ This module includes:
 - `filter_datum` function to redact sensitive data.
 - `RedactingFormatter` class to handle log redaction.
 - Functions to handle logging, database connection, and password hashing.
+
+Heavy dependencies (`mysql.connector`, `bcrypt`, the process and thread
+pools) are imported on first use, so importing this module for log
+redaction alone stays cheap; see `check_import_time.py`.
 """
 
 import re
+import copy
+import json
+import queue
+import signal
 import logging
-from typing import List
+import logging.handlers
+import weakref
+import functools
+from collections.abc import Mapping
+from typing import (Any, Callable, Dict, Iterable, Iterator, List,
+                    Sequence, TextIO, Tuple)
 import os
-import mysql.connector
-import bcrypt
+import sys
+import mmap
+import time
+import shutil
+import threading
+import contextlib
+import atexit
+from collections import deque
 
 PII_FIELDS = ("name", "email", "phone", "ssn", "password")
+REDACTOR_CACHE_SIZE = 128
+STREAM_BATCH_SIZE = 1000
+DEFAULT_POOL_SIZE = 5
+DEFAULT_POOL_IDLE_TIMEOUT = 300.0
+LOG_QUEUE_SIZE = 10000
+OVERFLOW_POLICIES = ("block", "drop_oldest", "drop_newest")
+REDACT_CHUNK_SIZE = 16 * 1024 * 1024
+LOG_BUFFER_SIZE = 64 * 1024
+LOG_FLUSH_INTERVAL = 1.0
+LOCK_POLL_INTERVAL = 0.1
+FSYNC_POLICIES = ("never", "flush", "rotate")
+SUPPRESSION_SUMMARY_INTERVAL = 10.0
+SAMPLING_MAX_TEMPLATES = 10000
+EXPORT_SHARDS = 8
+HISTOGRAM_BUCKETS_NS = (1000, 2000, 5000, 10000, 20000, 50000, 100000,
+                        1000000, float("inf"))
+_LOG_RECORD_ATTRS = frozenset(
+    logging.LogRecord("", logging.INFO, "", 0, "", None, None).__dict__
+) | {"message", "asctime"}
+
+
+class RedactionStats:
+    """
+    Counters and timings collected while instrumentation is enabled.
+
+    Attributes:
+        records (int): The number of records redacted: log records (once
+            each, whatever the number of handlers, args and extras) and
+            `filter_datum` messages.
+        matches (Dict[str, int]): The number of redacted values per field.
+        total_ns (int): The cumulative redaction time, in nanoseconds.
+        histogram (List[int]): The number of redactions (single passes of a
+            `Redactor`) whose duration fell in each bucket of
+            `HISTOGRAM_BUCKETS_NS` (upper bounds).
+    """
+
+    def __init__(self):
+        """
+        Initializes empty counters.
+        """
+        self.records = 0
+        self.matches = {}
+        self.total_ns = 0
+        self.histogram = [0] * len(HISTOGRAM_BUCKETS_NS)
+        self._lock = threading.Lock()
+
+    def count_record(self) -> None:
+        """
+        Accounts for one redacted record.
+        """
+        with self._lock:
+            self.records += 1
+
+    def record(self, matches: List[str], elapsed_ns: int) -> None:
+        """
+        Accounts for one redaction.
+
+        Args:
+            matches (List[str]): The field of every redacted value.
+            elapsed_ns (int): The time the redaction took.
+        """
+        bucket = next(index for index, bound
+                      in enumerate(HISTOGRAM_BUCKETS_NS)
+                      if elapsed_ns <= bound)
+        with self._lock:
+            self.total_ns += elapsed_ns
+            self.histogram[bucket] += 1
+            for field in matches:
+                self.matches[field] = self.matches.get(field, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Returns a consistent copy of the counters.
+
+        Returns:
+            Dict[str, Any]: `records`, `matches`, `total_ns` and
+            `histogram` (a list of [upper bound in ns, count] pairs, the
+            last bound being "+Inf").
+        """
+        with self._lock:
+            return {
+                'records': self.records,
+                'matches': dict(self.matches),
+                'total_ns': self.total_ns,
+                'histogram': [[bound if bound != float("inf") else "+Inf",
+                               count] for bound, count
+                              in zip(HISTOGRAM_BUCKETS_NS, self.histogram)],
+            }
+
+    def dump(self, stream: TextIO = None) -> None:
+        """
+        Writes a snapshot as one JSON line.
+
+        Args:
+            stream (TextIO): The stream to write to, `sys.stderr` by
+                default.
+        """
+        stream = stream if stream is not None else sys.stderr
+        stream.write(json.dumps(self.snapshot()) + "\n")
+        stream.flush()
+
+
+_redaction_stats = None
+_dump_requests = None
+_dump_stream = None
+
+
+def enable_instrumentation() -> RedactionStats:
+    """
+    Starts collecting redaction counters and timings.
+
+    While disabled, redaction only pays for one global lookup per call.
+
+    Returns:
+        RedactionStats: The active counters, fresh if they were disabled.
+    """
+    global _redaction_stats
+    if _redaction_stats is None:
+        _redaction_stats = RedactionStats()
+    return _redaction_stats
+
+
+def disable_instrumentation() -> None:
+    """
+    Stops collecting redaction counters and timings.
+    """
+    global _redaction_stats
+    _redaction_stats = None
+
+
+def get_redaction_stats() -> RedactionStats:
+    """
+    Returns the active counters, or None if instrumentation is disabled.
+    """
+    return _redaction_stats
+
+
+def dump_stats_on_signal(signum: int = None,
+                         stream: TextIO = None) -> None:
+    """
+    Dumps the redaction counters whenever the process receives a signal.
+
+    Instrumentation is enabled if it was not. Must be called from the main
+    thread. The signal handler takes no lock, as it may interrupt a thread
+    holding the counters' lock: it only wakes a daemon thread, through a
+    pipe, which writes the dump.
+
+    Args:
+        signum (int): The signal to handle, SIGUSR1 by default.
+        stream (TextIO): The stream to dump to, `sys.stderr` by default.
+
+    Raises:
+        ValueError: If no signal is given and the platform has no SIGUSR1.
+    """
+    if signum is None:
+        # Looked up here: SIGUSR1 does not exist on every platform
+        signum = getattr(signal, "SIGUSR1", None)
+        if signum is None:
+            raise ValueError("SIGUSR1 is not available on this platform")
+    global _dump_requests, _dump_stream
+    enable_instrumentation()
+    _dump_stream = stream
+    if _dump_requests is None:
+        read_fd, write_fd = os.pipe()
+        try:
+            os.set_blocking(write_fd, False)
+        except OSError:
+            pass
+        threading.Thread(target=_dump_stats_on_request, args=(read_fd,),
+                         name="redaction-stats-dumper", daemon=True).start()
+        _dump_requests = write_fd
+
+    def handler(signum, frame):
+        """ Requests a dump from the dumper thread """
+        try:
+            os.write(_dump_requests, b"\0")
+        except OSError:
+            # The pipe is full: dumps are already pending
+            pass
+
+    signal.signal(signum, handler)
+
+
+def _dump_stats_on_request(read_fd: int) -> None:
+    """
+    Dumps the redaction counters each time `dump_stats_on_signal`'s handler
+    writes to the pipe.
+    """
+    while os.read(read_fd, 512):
+        stats = get_redaction_stats()
+        if stats is not None:
+            stats.dump(_dump_stream)
+
+
+class Redactor:
+    """
+    Compiled redaction engine for `field=value<separator>` messages.
+
+    All fields are folded into a single alternation pattern that is compiled
+    once, so a message is rewritten in one pass regardless of how many
+    fields are redacted. Structured payloads (mappings) are redacted by a set
+    lookup on their keys instead, without going through the pattern.
+
+    Attributes:
+        fields (Tuple[str, ...]): The field names to be redacted.
+        redaction (str): The string that replaces each redacted value.
+        separator (str): The character separating field-value pairs.
+    """
+
+    def __init__(self, fields: Sequence[str], redaction: str,
+                 separator: str):
+        """
+        Compiles the redaction pattern for the given fields.
+
+        Args:
+            fields (Sequence[str]): The field names to be redacted.
+            redaction (str): The string to replace the field values with.
+            separator (str): The character separating field-value pairs.
+        """
+        self.fields = tuple(fields)
+        self.redaction = redaction
+        self.separator = separator
+        self._field_set = frozenset(self.fields)
+        self._pattern = None
+        if self.fields:
+            alternation = "|".join(re.escape(field) for field in self.fields)
+            self._pattern = re.compile(
+                f"({alternation})=[^{re.escape(separator)}]*")
+        self._suffix = "=" + redaction
+
+    def redact(self, message: str) -> str:
+        """
+        Redacts the configured fields in a message.
+
+        Args:
+            message (str): The input message containing field-value pairs.
+
+        Returns:
+            str: The message with sensitive fields redacted.
+        """
+        if self._pattern is None:
+            return message
+        stats = _redaction_stats
+        if stats is None:
+            return self._pattern.sub(self._replace, message)
+
+        started = time.perf_counter_ns()
+        matches = []
+
+        def replace(match: re.Match) -> str:
+            """ Replaces one match, remembering its field """
+            matches.append(match[1])
+            return match[1] + self._suffix
+
+        result = self._pattern.sub(replace, message)
+        stats.record(matches, time.perf_counter_ns() - started)
+        return result
+
+    def _replace(self, match: re.Match) -> str:
+        """
+        Builds the replacement of one match; cheaper than a sub() template.
+        """
+        return match[1] + self._suffix
+
+    def redact_mapping(self, data: Mapping) -> dict:
+        """
+        Redacts the configured fields in a structured payload.
+
+        Keys are matched at every nesting level, including mappings held
+        inside lists and tuples.
+
+        Args:
+            data (Mapping): The payload to redact.
+
+        Returns:
+            dict: A redacted copy of the payload.
+        """
+        stats = _redaction_stats
+        if stats is None:
+            return self._redact_mapping(data, None)
+        started = time.perf_counter_ns()
+        matches = []
+        result = self._redact_mapping(data, matches)
+        stats.record(matches, time.perf_counter_ns() - started)
+        return result
+
+    def _redact_mapping(self, data: Mapping, matches: List[str]) -> dict:
+        """
+        Redacts a mapping, appending redacted keys to `matches` if given.
+        """
+        result = {}
+        for key, value in data.items():
+            if key in self._field_set:
+                result[key] = self.redaction
+                if matches is not None:
+                    matches.append(key)
+            else:
+                result[key] = self._redact_value(value, matches)
+        return result
+
+    def _redact_value(self, value: Any, matches: List[str]) -> Any:
+        """
+        Redacts nested containers found inside a structured payload.
+        """
+        if isinstance(value, Mapping):
+            return self._redact_mapping(value, matches)
+        if isinstance(value, (list, tuple)):
+            return [self._redact_value(item, matches) for item in value]
+        return value
+
+
+@functools.lru_cache(maxsize=REDACTOR_CACHE_SIZE)
+def _cached_redactor(fields: tuple, redaction: str,
+                     separator: str) -> Redactor:
+    """
+    Builds a Redactor, memoized per (fields, redaction, separator).
+    """
+    return Redactor(fields, redaction, separator)
+
+
+def get_redactor(fields: Sequence[str], redaction: str,
+                 separator: str) -> Redactor:
+    """
+    Returns a compiled Redactor, reusing a cached one when possible.
+
+    Args:
+        fields (Sequence[str]): The field names to be redacted.
+        redaction (str): The string to replace the field values with.
+        separator (str): The character separating field-value pairs.
+
+    Returns:
+        Redactor: A compiled redactor for the given parameters.
+    """
+    return _cached_redactor(tuple(fields), redaction, separator)
 
 
 class RedactingFormatter(logging.Formatter):
@@ -26,25 +379,75 @@ class RedactingFormatter(logging.Formatter):
     This class formats log messages by replacing the values of sensitive fields
     with a redaction string before outputting the log message.
 
+    Structured records are redacted by key: a mapping `msg` is emitted as
+    JSON instead of being scanned as a `field=value;` string, and mapping
+    `args` are redacted before interpolation, the resulting message then
+    being scanned as usual.
+
+    Records are never modified: the message, with its `args` interpolated,
+    is redacted into a copy that is cached on the record, so a record going
+    through several handlers is only redacted once per field set. Attributes
+    passed with `extra=` are redacted as well when they are named after a
+    PII field or listed in `extras`.
+
+    A formatter built with the default PII_FIELDS follows the field
+    registry when one is configured (see `get_field_registry`); one built
+    with other fields keeps them.
+
     Attributes:
         fields (List[str]): A list of field names to be redacted in the log
             messages.
+        extras (Tuple[str, ...]): Names of `extra=` attributes whose values
+            are redacted like messages.
     """
 
     REDACTION = "***"
     FORMAT = "[HOLBERTON] %(name)s %(levelname)s %(asctime)-15s: %(message)s"
     SEPARATOR = ";"
 
-    def __init__(self, fields: List[str]):
+    def __init__(self, fields: List[str], extras: Sequence[str] = ()):
         """
         Initializes the RedactingFormatter with a list of fields to redact.
 
         Args:
             fields (List[str]): The list of field names to be redacted in log
             messages.
+            extras (Sequence[str]): Names of `extra=` attributes whose values
+            are redacted like messages.
         """
         self.fields = fields
+        self.extras = tuple(extras)
         super(RedactingFormatter, self).__init__(self.FORMAT)
+        if tuple(fields) == PII_FIELDS:
+            registry = get_field_registry()
+            if registry is not None:
+                registry.attach(self)
+
+    @property
+    def fields(self) -> List[str]:
+        """
+        The field names redacted by this formatter.
+        """
+        return self._state[0]
+
+    @fields.setter
+    def fields(self, fields: List[str]):
+        """
+        Sets the redacted fields and resolves the matching Redactor.
+
+        The fields and their Redactor are swapped in with a single
+        assignment, so a concurrent `format` sees either the old or the new
+        field set, never a mix of both.
+        """
+        self._state = (fields, get_redactor(fields, self.REDACTION,
+                                            self.SEPARATOR))
+
+    @property
+    def _redactor(self) -> Redactor:
+        """
+        The Redactor matching the current field set.
+        """
+        return self._state[1]
 
     def format(self, record: logging.LogRecord) -> str:
         """
@@ -56,10 +459,215 @@ class RedactingFormatter(logging.Formatter):
         Returns:
             str: The formatted log message with sensitive fields redacted.
         """
-        # Redact sensitive information in the log message
-        record.msg = filter_datum(self.fields, self.REDACTION,
-                                  record.msg, self.SEPARATOR)
-        return super().format(record)
+        redactor = self._redactor
+        redacted = copy.copy(record)
+        redacted.msg = self._cached_message(record, redactor)
+        redacted.args = None
+        for attr in self._extra_attrs(record, redactor):
+            setattr(redacted, attr, self._redact_extra(
+                attr, getattr(record, attr), redactor))
+        return super().format(redacted)
+
+    def redact_message(self, record: logging.LogRecord) -> str:
+        """
+        Returns the redacted message of a record, computing it only once.
+
+        Args:
+            record (logging.LogRecord): The log record.
+
+        Returns:
+            str: The message, with its arguments merged, redacted.
+        """
+        return self._cached_message(record, self._redactor)
+
+    @staticmethod
+    def _cached_message(record: logging.LogRecord,
+                        redactor: Redactor) -> str:
+        """
+        Returns the message of a record redacted by `redactor`, memoized on
+        the record.
+        """
+        cache = record.__dict__.setdefault('_redacted_messages', {})
+        message = cache.get(redactor)
+        if message is None:
+            stats = _redaction_stats
+            if stats is not None and not cache:
+                # Counted once, however many passes redact the record
+                stats.count_record()
+            message = cache[redactor] = RedactingFormatter._redact_message(
+                record, redactor)
+        return message
+
+    @staticmethod
+    def _redact_message(record: logging.LogRecord,
+                        redactor: Redactor) -> str:
+        """
+        Redacts the message of a record, structured or not.
+        """
+        if isinstance(record.msg, Mapping):
+            return json.dumps(redactor.redact_mapping(record.msg),
+                              default=str)
+        if isinstance(record.args, Mapping):
+            # Values are redacted by key, then the whole message is: a field
+            # may be named in the template itself
+            return redactor.redact(
+                str(record.msg) % redactor.redact_mapping(record.args))
+        return redactor.redact(record.getMessage())
+
+    def _extra_attrs(self, record: logging.LogRecord,
+                     redactor: Redactor) -> List[str]:
+        """
+        Lists the `extra=` attributes of a record that must be redacted.
+        """
+        return [attr for attr in record.__dict__
+                if attr not in _LOG_RECORD_ATTRS
+                and (attr in self.extras or attr in redactor._field_set)]
+
+    def _redact_extra(self, attr: str, value: Any,
+                      redactor: Redactor) -> Any:
+        """
+        Redacts the value of an `extra=` attribute.
+        """
+        if attr in redactor._field_set:
+            return redactor.redaction
+        if isinstance(value, Mapping):
+            return redactor.redact_mapping(value)
+        if isinstance(value, str):
+            return redactor.redact(value)
+        return value
+
+
+class FieldRegistry:
+    """
+    Hot-reloadable set of PII fields shared by live RedactingFormatters.
+
+    The fields are read from a JSON file holding a list of field names. A
+    background thread polls the file for changes; a new field set is
+    compiled on that thread, then swapped into every attached formatter
+    with a single assignment, so formatting never blocks on a reload.
+    While the file is missing or invalid, the previous fields are kept.
+
+    Attributes:
+        path (str): The path of the JSON config file.
+        interval (float): The number of seconds between two polls.
+        fields (Tuple[str, ...]): The current field set.
+    """
+
+    def __init__(self, path: str, default: Sequence[str] = PII_FIELDS,
+                 interval: float = 1.0):
+        """
+        Initializes the registry and loads the config file once.
+
+        Args:
+            path (str): The path of the JSON config file.
+            default (Sequence[str]): The fields used until the file can be
+                loaded.
+            interval (float): The number of seconds between two polls.
+        """
+        self.path = path
+        self.interval = interval
+        self.fields = tuple(default)
+        self._mtime = None
+        self._formatters = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.reload()
+
+    def attach(self, formatter: RedactingFormatter) -> None:
+        """
+        Keeps a formatter in sync with the registry.
+
+        Args:
+            formatter (RedactingFormatter): The formatter to update on every
+                reload. It is held by a weak reference.
+        """
+        with self._lock:
+            self._formatters.add(formatter)
+            formatter.fields = self.fields
+
+    def reload(self) -> bool:
+        """
+        Reloads the config file if it changed since the last load.
+
+        Returns:
+            bool: True if a new field set was swapped in.
+        """
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+            if mtime == self._mtime:
+                return False
+            with open(self.path, 'r') as f:
+                fields = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if not isinstance(fields, list) or \
+                not all(isinstance(field, str) for field in fields):
+            return False
+        self._mtime = mtime
+        fields = tuple(fields)
+        if fields == self.fields:
+            return False
+        # Compile off the hot path; formatters then hit the Redactor cache
+        get_redactor(fields, RedactingFormatter.REDACTION,
+                     RedactingFormatter.SEPARATOR)
+        with self._lock:
+            self.fields = fields
+            for formatter in list(self._formatters):
+                formatter.fields = fields
+        return True
+
+    def start(self) -> None:
+        """
+        Starts watching the config file in a daemon thread.
+        """
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch,
+                                        name="pii-field-registry",
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stops watching the config file.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _watch(self) -> None:
+        """
+        Polls the config file until `stop` is called.
+        """
+        while not self._stop.wait(self.interval):
+            self.reload()
+
+
+_field_registry = None
+_field_registry_lock = threading.Lock()
+
+
+def get_field_registry() -> FieldRegistry:
+    """
+    Returns the process-wide PII field registry, if one is configured.
+
+    The registry is created and started on first use when the
+    PERSONAL_DATA_PII_FIELDS_FILE environment variable names its JSON
+    config file.
+
+    Returns:
+        FieldRegistry: The shared registry, or None if not configured.
+    """
+    global _field_registry
+    path = os.getenv('PERSONAL_DATA_PII_FIELDS_FILE')
+    with _field_registry_lock:
+        if _field_registry is None and path:
+            _field_registry = FieldRegistry(path)
+            _field_registry.start()
+        return _field_registry
 
 
 def filter_datum(fields: List[str], redaction: str,
@@ -67,9 +675,10 @@ def filter_datum(fields: List[str], redaction: str,
     """
     Redacts sensitive fields in a given message.
 
-    This function iterates over a list of fields to be redacted, replaces their
-    corresponding values in the message with a provided redaction string, and
-    returns the modified message.
+    This function replaces the values of the given fields in the message with
+    a provided redaction string and returns the modified message. The work is
+    delegated to a cached, precompiled `Redactor`, so repeated calls with the
+    same fields only pay for a single pass over the message.
 
     Args:
         fields (List[str]): A list of field names to be redacted
@@ -96,13 +705,459 @@ def filter_datum(fields: List[str], redaction: str,
         date_of_birth=xxx;'
     """
     # Redact the sensitive fields in the message
-    for field in fields:
-        message = re.sub(f"{field}=[^{re.escape(separator)}]*",
-                         f"{field}={redaction}", message)
-    return message
+    stats = _redaction_stats
+    if stats is not None:
+        stats.count_record()
+    return get_redactor(fields, redaction, separator).redact(message)
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that only enqueues records on the calling thread.
+
+    Formatting, redaction and I/O are left to the `QueueListener` draining
+    the queue. When the bounded queue is full, the overflow policy decides
+    what happens:
+        - "block": wait until the listener frees a slot.
+        - "drop_oldest": discard the oldest queued record.
+        - "drop_newest": discard the record being logged.
+
+    Attributes:
+        overflow (str): The overflow policy.
+        dropped (int): The number of records discarded because of overflow.
+        listener (BoundedQueueListener): The listener draining the queue,
+            stopped when the handler is closed.
+    """
+
+    def __init__(self, log_queue: queue.Queue, overflow: str = "block"):
+        """
+        Initializes the handler with a bounded queue and overflow policy.
+
+        Args:
+            log_queue (queue.Queue): The queue records are put on.
+            overflow (str): One of `OVERFLOW_POLICIES`.
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError("overflow must be one of {}".format(
+                ", ".join(OVERFLOW_POLICIES)))
+        super().__init__(log_queue)
+        self.overflow = overflow
+        self.dropped = 0
+        self.listener = None
+        self._dropped_lock = threading.Lock()
+
+    @property
+    def depth(self) -> int:
+        """
+        The number of records currently waiting in the queue.
+        """
+        return self.queue.qsize()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Returns the record untouched, deferring all formatting.
+        """
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """
+        Puts a record on the queue, applying the overflow policy.
+        """
+        if self.overflow == "block":
+            self.queue.put(record)
+            return
+        while True:
+            try:
+                self.queue.put_nowait(record)
+                return
+            except queue.Full:
+                if self.overflow == "drop_newest":
+                    self._count_drop()
+                    return
+            try:
+                self.queue.get_nowait()
+                self._count_drop()
+            except queue.Empty:
+                pass
+
+    def _count_drop(self) -> None:
+        """
+        Counts one discarded record; producers may run on several threads.
+        """
+        with self._dropped_lock:
+            self.dropped += 1
+
+    def close(self) -> None:
+        """
+        Stops the listener, flushing queued records, and closes the handler.
+        """
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+        super().close()
+
+
+class BoundedQueueListener(logging.handlers.QueueListener):
+    """
+    Queue listener whose stop sentinel waits for room on a bounded queue.
+
+    The stock listener enqueues its sentinel with `put_nowait`, which fails
+    with `queue.Full` when stopped while the queue is full, leaving the
+    listener running and the queued records unwritten.
+    """
+
+    def enqueue_sentinel(self) -> None:
+        """
+        Puts the stop sentinel on the queue, waiting for a free slot.
+        """
+        self.queue.put(self._sentinel)
+
+
+class BufferedFileHandler(logging.Handler):
+    """
+    File handler that batches formatted lines into few large writes.
+
+    Lines are collected in memory and written out in one call when the
+    buffer reaches `buffer_size` bytes, when `flush_interval` seconds have
+    passed since the last write, or as soon as a record of `flush_level` or
+    above is logged. The file can be rotated by size and/or age, keeping
+    `backup_count` old files named `filename.1` (newest) to
+    `filename.<backup_count>`.
+
+    Attributes:
+        filename (str): The path of the log file.
+        fsync (str): When data is forced to disk: "never", on every
+            "flush", or only before a "rotate".
+    """
+
+    def __init__(self, filename: str, buffer_size: int = LOG_BUFFER_SIZE,
+                 flush_interval: float = LOG_FLUSH_INTERVAL,
+                 flush_level: int = logging.ERROR, max_bytes: int = 0,
+                 rotate_interval: float = 0, backup_count: int = 5,
+                 fsync: str = "never"):
+        """
+        Opens the log file and starts the periodic flusher.
+
+        Args:
+            filename (str): The path of the log file.
+            buffer_size (int): The number of buffered bytes that triggers
+                a write.
+            flush_interval (float): The maximum number of seconds a line
+                stays buffered, or 0 to only flush on size and level.
+            flush_level (int): The level from which a record is written out
+                immediately.
+            max_bytes (int): The size that triggers a rotation, or 0.
+            rotate_interval (float): The age, in seconds, that triggers a
+                rotation, or 0.
+            backup_count (int): The number of rotated files kept.
+            fsync (str): One of `FSYNC_POLICIES`.
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError("fsync must be one of {}".format(
+                ", ".join(FSYNC_POLICIES)))
+        super().__init__()
+        self.filename = os.path.abspath(filename)
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.flush_level = flush_level
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.backup_count = backup_count
+        self.fsync = fsync
+        self._buffer = []
+        self._buffered = 0
+        self._stream = open(self.filename, 'a', encoding='utf-8')
+        self._next_rotation = (time.time() + rotate_interval
+                               if rotate_interval else None)
+        self._stop = threading.Event()
+        self._flusher = None
+        if flush_interval:
+            self._flusher = threading.Thread(target=self._flush_periodically,
+                                             name="buffered-file-handler",
+                                             daemon=True)
+            self._flusher.start()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """
+        Buffers a formatted record, writing the buffer out when needed.
+        """
+        try:
+            line = self.format(record) + "\n"
+        except Exception:
+            self.handleError(record)
+            return
+        self._buffer.append(line)
+        self._buffered += len(line)
+        if self._buffered >= self.buffer_size or \
+                record.levelno >= self.flush_level:
+            self._write()
+
+    def flush(self) -> None:
+        """
+        Writes out every buffered line.
+        """
+        self.acquire()
+        try:
+            self._write()
+        finally:
+            self.release()
+
+    def close(self) -> None:
+        """
+        Stops the periodic flusher, flushes and closes the file.
+        """
+        self._stop.set()
+        if self._flusher is not None and \
+                self._flusher is not threading.current_thread():
+            self._flusher.join()
+        self.acquire()
+        try:
+            if self._stream is not None:
+                self._write()
+                self._stream.close()
+                self._stream = None
+        finally:
+            self.release()
+        super().close()
+
+    def _write(self) -> None:
+        """
+        Writes the buffer in a single call, rotating first if due.
+
+        Must be called with the handler lock held.
+        """
+        if not self._buffer or self._stream is None:
+            return
+        data = "".join(self._buffer)
+        self._buffer = []
+        self._buffered = 0
+        if self._should_rotate(len(data)):
+            self._rotate()
+        self._stream.write(data)
+        self._stream.flush()
+        if self.fsync == "flush":
+            os.fsync(self._stream.fileno())
+
+    def _should_rotate(self, incoming: int) -> bool:
+        """
+        Tells whether the file must be rotated before writing more bytes.
+        """
+        if self.max_bytes and self._stream.tell() and \
+                self._stream.tell() + incoming > self.max_bytes:
+            return True
+        return (self._next_rotation is not None and
+                time.time() >= self._next_rotation)
+
+    def _rotate(self) -> None:
+        """
+        Closes the current file, shifts the backups and reopens the file.
+        """
+        if self.fsync != "never":
+            os.fsync(self._stream.fileno())
+        self._stream.close()
+        if self.backup_count > 0:
+            for index in range(self.backup_count - 1, 0, -1):
+                source = "{}.{}".format(self.filename, index)
+                if os.path.exists(source):
+                    os.replace(source, "{}.{}".format(self.filename,
+                                                      index + 1))
+            os.replace(self.filename, self.filename + ".1")
+        else:
+            os.remove(self.filename)
+        self._stream = open(self.filename, 'a', encoding='utf-8')
+        if self._next_rotation is not None:
+            self._next_rotation = time.time() + self.rotate_interval
+
+    def _flush_periodically(self) -> None:
+        """
+        Flushes the buffer every `flush_interval` seconds until closed.
+
+        The handler lock is taken with a timeout: `logging.shutdown` calls
+        `close` with the lock held, and `close` waits for this thread.
+        """
+        while not self._stop.wait(self.flush_interval):
+            while not self.lock.acquire(timeout=LOCK_POLL_INTERVAL):
+                if self._stop.is_set():
+                    return
+            try:
+                self._write()
+            finally:
+                self.lock.release()
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Logger filter that samples and rate-limits records before formatting.
+
+    Attached to a logger, it runs before any handler, so suppressed records
+    never pay for redaction or formatting. Two independent limits apply:
+        - sampling: only 1 in `sample_every` records is kept per message
+          template (the unformatted `msg`), starting with the first one.
+        - rate limiting: a token bucket per logger and level lets `rate`
+          records per second through, with bursts of up to `burst`.
+    Suppressed records are counted, and a single WARNING line summarizing
+    them is logged at most every `summary_interval` seconds: by the next
+    record going through the filter, or else by a timer once the interval
+    is over, so the counts of a flood that stopped are still reported.
+    Pending counts are also reported by `close`, which runs at exit.
+
+    Attributes:
+        sampled (int): The number of records dropped by sampling.
+        rate_limited (int): The number of records dropped by rate limiting.
+    """
+
+    def __init__(self, sample_every: int = 1, rate: float = 0,
+                 burst: float = None,
+                 summary_interval: float = SUPPRESSION_SUMMARY_INTERVAL):
+        """
+        Initializes the filter.
+
+        Args:
+            sample_every (int): Keep 1 in N records per template; 1 keeps
+                every record.
+            rate (float): The sustained number of records per second per
+                logger and level, or 0 for no rate limiting.
+            burst (float): The bucket capacity, `rate` by default.
+            summary_interval (float): The minimum number of seconds between
+                two summary lines.
+        """
+        super().__init__()
+        self.sample_every = max(1, int(sample_every))
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate, 1)
+        self.summary_interval = summary_interval
+        self.sampled = 0
+        self.rate_limited = 0
+        self._seen = {}
+        self._buckets = {}
+        self._reported = (0, 0)
+        self._next_summary = time.monotonic() + summary_interval
+        self._timer = None
+        self._name = None
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """
+        Tells whether a record is kept.
+        """
+        if getattr(record, '_suppression_summary', False):
+            return True
+        now = time.monotonic()
+        with self._lock:
+            keep = self._sample(record) and self._take_token(record, now)
+            if not keep:
+                self._name = record.name
+                self._schedule_summary(now)
+            summary = self._pending_summary(now)
+        if summary is not None:
+            self._log_summary(record.name, summary)
+        return keep
+
+    def flush_summary(self) -> None:
+        """
+        Logs the summary of the records suppressed since the last one, if
+        any, without waiting for the end of the interval.
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            summary = self._pending_summary(time.monotonic(), force=True)
+            name = self._name
+        if summary is not None:
+            self._log_summary(name, summary)
+
+    def close(self) -> None:
+        """
+        Reports the pending suppressed counts and stops the summary timer.
+        """
+        self.flush_summary()
+
+    def _schedule_summary(self, now: float) -> None:
+        """
+        Arms the timer logging the summary at the end of the interval.
+        """
+        if self._timer is not None:
+            return
+        self._timer = threading.Timer(max(0.0, self._next_summary - now),
+                                      self.flush_summary)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _sample(self, record: logging.LogRecord) -> bool:
+        """
+        Applies 1-in-N sampling per message template.
+        """
+        if self.sample_every == 1:
+            return True
+        try:
+            key = (record.name, record.levelno, record.msg)
+            seen = self._seen.get(key, 0)
+        except TypeError:
+            return True
+        if len(self._seen) >= SAMPLING_MAX_TEMPLATES and seen == 0:
+            self._seen.clear()
+        self._seen[key] = seen + 1
+        if seen % self.sample_every == 0:
+            return True
+        self.sampled += 1
+        return False
+
+    def _take_token(self, record: logging.LogRecord, now: float) -> bool:
+        """
+        Applies the token bucket of the record's logger and level.
+        """
+        if not self.rate:
+            return True
+        key = (record.name, record.levelno)
+        tokens, last = self._buckets.get(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - last) * self.rate)
+        if tokens >= 1:
+            self._buckets[key] = (tokens - 1, now)
+            return True
+        self._buckets[key] = (tokens, now)
+        self.rate_limited += 1
+        return False
+
+    def _pending_summary(self, now: float,
+                         force: bool = False) -> Tuple[int, int]:
+        """
+        Returns the counts to summarize, if a summary line is due (or, with
+        `force`, if there is any).
+        """
+        if now < self._next_summary and not force:
+            return None
+        self._next_summary = now + self.summary_interval
+        sampled = self.sampled - self._reported[0]
+        rate_limited = self.rate_limited - self._reported[1]
+        self._reported = (self.sampled, self.rate_limited)
+        if not sampled and not rate_limited:
+            return None
+        return sampled, rate_limited
+
+    def _log_summary(self, name: str, counts: Tuple[int, int]) -> None:
+        """
+        Logs one line summarizing the records suppressed since the last one.
+        """
+        sampled, rate_limited = counts
+        logging.getLogger(name).warning(
+            "suppressed %d records (sampled: %d, rate limited: %d)",
+            sampled + rate_limited, sampled, rate_limited,
+            extra={'_suppression_summary': True})
+
+
+_logger_lock = threading.Lock()
+_logger_config = {}
+_LOGGER_DEFAULTS = {'queued': False, 'queue_size': LOG_QUEUE_SIZE,
+                    'overflow': "block", 'log_file': None, 'sample_every': 1,
+                    'rate_limit': 0}
 
 
-def get_logger() -> logging.Logger:
+def get_logger(queued: bool = None, queue_size: int = None,
+               overflow: str = None, log_file: str = None,
+               sample_every: int = None,
+               rate_limit: float = None) -> logging.Logger:
     """
     Creates and configures a logger named 'user_data' for logging user data.
 
@@ -113,32 +1168,107 @@ def get_logger() -> logging.Logger:
         - Uses a stream handler to log messages to the console.
         - Applies a custom RedactingFormatter to redact sensitive fields.
 
+    When PERSONAL_DATA_PII_FIELDS_FILE is set, the redacted fields follow
+    that file (see `FieldRegistry`) instead of the static PII_FIELDS.
+
+    The logger is configured only once; later calls return it unchanged, so
+    handlers are never duplicated, and raise a ValueError if they ask for a
+    different configuration. Arguments left to None take their default
+    value on the first call and accept the existing configuration on later
+    ones. In queued mode, callers only enqueue
+    records on a bounded queue and a background listener thread performs
+    the redaction and the writes.
+
+    Args:
+        queued (bool): Whether to log through a background listener
+            (default False).
+        queue_size (int): The capacity of the queue in queued mode
+            (default LOG_QUEUE_SIZE).
+        overflow (str): The overflow policy in queued mode, one of
+            `OVERFLOW_POLICIES` (default "block").
+        log_file (str): When set, records are also written to this file
+            through a `BufferedFileHandler`.
+        sample_every (int): Keep only 1 in N records per message template,
+            see `SamplingFilter` (default 1).
+        rate_limit (float): The maximum number of records per second per
+            level, or 0 for no limit, see `SamplingFilter` (default 0).
+
     Returns:
         logging.Logger: A configured logger instance with redaction enabled.
+
+    Raises:
+        ValueError: If the logger is already configured differently.
     """
+    requested = {'queued': queued, 'queue_size': queue_size,
+                 'overflow': overflow, 'log_file': log_file,
+                 'sample_every': sample_every, 'rate_limit': rate_limit}
+    requested = {name: value for name, value in requested.items()
+                 if value is not None}
 
     # Creating a logger named "user_data"
     logger = logging.getLogger("user_data")
+    with _logger_lock:
+        if not logger.handlers:
+            config = dict(_LOGGER_DEFAULTS, **requested)
+            _configure_logger(logger, config['queued'], config['queue_size'],
+                              config['overflow'], config['log_file'])
+            if config['sample_every'] > 1 or config['rate_limit']:
+                logger.addFilter(SamplingFilter(config['sample_every'],
+                                                config['rate_limit']))
+            _logger_config.clear()
+            _logger_config.update(config)
+        elif _logger_config:
+            conflicts = ["{}={!r}".format(name, _logger_config[name])
+                         for name, value in requested.items()
+                         if value != _logger_config[name]]
+            if conflicts:
+                raise ValueError(
+                    "the user_data logger is already configured with "
+                    + ", ".join(conflicts))
+    return logger
+
+
+def _configure_logger(logger: logging.Logger, queued: bool,
+                      queue_size: int, overflow: str, log_file: str) -> None:
+    """
+    Attaches the redacting handlers to a fresh 'user_data' logger.
+    """
     logger.setLevel(logging.INFO)
 
     # Ensures that the logger doesn't propagate messages to other loggers
     logger.propagate = False
 
-    # RedactingFormatter with PII_FIELDS
+    # RedactingFormatter with PII_FIELDS, kept in sync with the field
+    # registry when one is configured
     formatter = RedactingFormatter(fields=PII_FIELDS)
 
     # Creating a stream handler to log to the console and attaching
     # the formatter
     stream_handler = logging.StreamHandler()
     stream_handler.setFormatter(formatter)
+    handlers = [stream_handler]
 
-    # Attaching the handler to the logger
-    logger.addHandler(stream_handler)
+    # Batching the writes to the log file, if any
+    if log_file is not None:
+        file_handler = BufferedFileHandler(log_file)
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
 
-    return logger
+    if not queued:
+        # Attaching the handlers to the logger
+        for handler in handlers:
+            logger.addHandler(handler)
+        return
 
+    # Only enqueue on the calling thread; the listener formats and writes
+    queue_handler = BoundedQueueHandler(queue.Queue(queue_size), overflow)
+    queue_handler.listener = BoundedQueueListener(
+        queue_handler.queue, *handlers, respect_handler_level=True)
+    queue_handler.listener.start()
+    logger.addHandler(queue_handler)
 
-def get_db() -> mysql.connector.connection.MySQLConnection:
+
+def get_db() -> "mysql.connector.connection.MySQLConnection":
     """
     Establishes a connection to a MySQL database using credentials from
     environment variables.
@@ -161,6 +1291,8 @@ def get_db() -> mysql.connector.connection.MySQLConnection:
         mysql.connector.Error: If there is any issue with the database
         connection.
     """
+    import mysql.connector
+
     return mysql.connector.connect(
         host=os.getenv('PERSONAL_DATA_DB_HOST'),
         user=os.getenv('PERSONAL_DATA_DB_USERNAME'),
@@ -169,7 +1301,612 @@ def get_db() -> mysql.connector.connection.MySQLConnection:
     )
 
 
-def main() -> None:
+class ConnectionPool:
+    """
+    Bounded pool of reusable database connections.
+
+    Connections are created lazily through a pluggable `connect` callable, so
+    the same pool logic works with `mysql.connector` or any DB-API driver
+    (e.g. `sqlite3`). Idle connections are health-checked on checkout and
+    discarded once they have been idle for longer than `idle_timeout`.
+
+    Attributes:
+        size (int): The maximum number of open connections.
+        idle_timeout (float): The number of seconds a connection may stay
+            idle in the pool before it is closed instead of reused.
+    """
+
+    def __init__(self, connect: Callable[[], Any],
+                 size: int = DEFAULT_POOL_SIZE,
+                 idle_timeout: float = DEFAULT_POOL_IDLE_TIMEOUT):
+        """
+        Initializes an empty pool.
+
+        Args:
+            connect (Callable[[], Any]): Opens and returns a new connection.
+            size (int): The maximum number of open connections.
+            idle_timeout (float): The maximum idle time of a pooled
+                connection, in seconds.
+        """
+        if size < 1:
+            raise ValueError("pool size must be at least 1")
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self._connect = connect
+        self._idle = deque()
+        self._open = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def acquire(self, timeout: float = None):
+        """
+        Checks a healthy connection out of the pool.
+
+        Args:
+            timeout (float): The number of seconds to wait for a connection
+                when the pool is exhausted, or None to wait forever.
+
+        Returns:
+            A database connection, to be given back with `release`.
+
+        Raises:
+            TimeoutError: If no connection became available in time.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._cond:
+                entry = self._checkout(deadline)
+            if entry is None:
+                break
+            conn, idle_since = entry
+            if self._is_usable(conn, idle_since):
+                return conn
+            self._discard(conn)
+        try:
+            return self._connect()
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, conn) -> None:
+        """
+        Gives a connection back to the pool.
+
+        Args:
+            conn: A connection obtained from `acquire`.
+        """
+        with self._cond:
+            if not self._closed:
+                self._idle.append((conn, time.monotonic()))
+                self._cond.notify()
+                return
+        self._discard(conn)
+
+    @contextlib.contextmanager
+    def connection(self, timeout: float = None) -> Iterator:
+        """
+        Context manager yielding a pooled connection.
+
+        The connection is returned to the pool when the block exits, whether
+        it exits normally or with an exception.
+
+        Args:
+            timeout (float): See `acquire`.
+
+        Yields:
+            A database connection.
+        """
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self) -> None:
+        """
+        Closes every idle connection and stops pooling returned ones.
+        """
+        with self._cond:
+            self._closed = True
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+        for conn in idle:
+            self._discard(conn)
+
+    def _checkout(self, deadline: float):
+        """
+        Pops an idle connection, or reserves a slot for a new one (None).
+
+        Must be called with the pool lock held.
+        """
+        while True:
+            if self._closed:
+                raise RuntimeError("connection pool is closed")
+            if self._idle:
+                return self._idle.pop()
+            if self._open < self.size:
+                self._open += 1
+                return None
+            remaining = None
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("no pooled connection available")
+            self._cond.wait(remaining)
+
+    def _is_usable(self, conn, idle_since: float) -> bool:
+        """
+        Tells whether an idle connection is fresh enough and still alive.
+        """
+        if time.monotonic() - idle_since > self.idle_timeout:
+            return False
+        try:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("SELECT 1")
+                cursor.fetchall()
+            finally:
+                cursor.close()
+        except Exception:
+            return False
+        return True
+
+    def _discard(self, conn) -> None:
+        """
+        Closes a connection and frees its slot in the pool.
+        """
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._open -= 1
+            self._cond.notify()
+
+
+_db_pool = None
+_db_pool_lock = threading.Lock()
+
+
+def get_db_pool() -> ConnectionPool:
+    """
+    Returns the process-wide pool of `get_db()` connections.
+
+    The pool is created on first use. Its size and idle timeout are read
+    from the environment variables:
+        - PERSONAL_DATA_DB_POOL_SIZE: The maximum number of connections.
+        - PERSONAL_DATA_DB_POOL_IDLE_TIMEOUT: The idle timeout in seconds.
+
+    Returns:
+        ConnectionPool: The shared connection pool.
+    """
+    global _db_pool
+    with _db_pool_lock:
+        if _db_pool is None:
+            _db_pool = ConnectionPool(
+                get_db,
+                size=int(os.getenv('PERSONAL_DATA_DB_POOL_SIZE',
+                                   DEFAULT_POOL_SIZE)),
+                idle_timeout=float(os.getenv(
+                    'PERSONAL_DATA_DB_POOL_IDLE_TIMEOUT',
+                    DEFAULT_POOL_IDLE_TIMEOUT)))
+        return _db_pool
+
+
+def iter_rows(cursor, batch_size: int = STREAM_BATCH_SIZE) -> Iterator:
+    """
+    Yields the rows of an executed cursor, fetching them in batches.
+
+    Only `batch_size` rows are held in memory at a time, so the memory
+    footprint does not depend on the size of the result set.
+
+    Args:
+        cursor: A DB-API cursor on which a query has been executed.
+        batch_size (int): The number of rows requested per `fetchmany`.
+
+    Yields:
+        tuple: One row of the result set.
+    """
+    for rows in iter_batches(cursor, batch_size):
+        yield from rows
+
+
+def iter_batches(cursor, batch_size: int = STREAM_BATCH_SIZE) -> Iterator:
+    """
+    Yields the rows of an executed cursor as `fetchmany` batches.
+
+    Args:
+        cursor: A DB-API cursor on which a query has been executed.
+        batch_size (int): The number of rows requested per `fetchmany`.
+
+    Yields:
+        list: One non-empty batch of rows.
+    """
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield rows
+
+
+def format_row(columns: Sequence[str], row: Sequence) -> str:
+    """
+    Renders a row as a `field=value;` log message.
+
+    Args:
+        columns (Sequence[str]): The column names of the row.
+        row (Sequence): The column values of the row.
+
+    Returns:
+        str: The row rendered as field-value pairs.
+    """
+    return "".join(f"{column}={value}{RedactingFormatter.SEPARATOR}"
+                   for column, value in zip(columns, row))
+
+
+def _is_pii_column(column: str, fields: Sequence[str]) -> bool:
+    """
+    Tells whether `filter_datum` would redact the values of a column.
+    """
+    return column.endswith(tuple(fields))
+
+
+def redact_batch(columns: Sequence[str], rows: Sequence[Sequence],
+                 fields: Sequence[str] = PII_FIELDS,
+                 redaction: str = RedactingFormatter.REDACTION,
+                 separator: str = RedactingFormatter.SEPARATOR) -> List[str]:
+    """
+    Renders a batch of rows as redacted `field=value;` messages, by column.
+
+    The batch is transposed into columns and PII columns are dropped as a
+    whole: their `field=redaction;` pairs are baked into a line template
+    once per batch, so PII values are never read, stringified or scanned.
+    Only the remaining columns are rendered into the template, after their
+    values are scanned for `field=value` text like any message.
+
+    Args:
+        columns (Sequence[str]): The column names of the rows.
+        rows (Sequence[Sequence]): A batch of rows, e.g. from `fetchmany`.
+        fields (Sequence[str]): The field names to be redacted.
+        redaction (str): The string to replace the field values with.
+        separator (str): The character separating field-value pairs.
+
+    Returns:
+        List[str]: One redacted message per row. It matches `filter_datum`
+        applied to `format_row`, except when a PII value contains the
+        separator: the whole value is redacted here, while `filter_datum`
+        only redacts it up to the separator and leaves the rest in clear.
+    """
+    redactor = get_redactor(fields, redaction, separator)
+    parts = []
+    kept = []
+    separator = separator.replace("%", "%%")
+    for index, column in enumerate(columns):
+        if _is_pii_column(column, fields):
+            parts.append("{}={}{}".format(column.replace("%", "%%"),
+                                          redaction.replace("%", "%%"),
+                                          separator))
+        else:
+            parts.append("{}=%s{}".format(column.replace("%", "%%"),
+                                          separator))
+            kept.append(index)
+    template = "".join(parts)
+    if not kept:
+        return [template % ()] * len(rows)
+    table = list(zip(*rows))
+    values = [[redactor.redact(str(value)) for value in table[index]]
+              for index in kept]
+    return [template % line for line in zip(*values)]
+
+
+def _logger_formatter(logger: logging.Logger) -> logging.Formatter:
+    """
+    Returns the formatter of a logger's handlers, or of the handlers of its
+    queue listener in queued mode.
+    """
+    handlers = list(logger.handlers)
+    for handler in logger.handlers:
+        listener = getattr(handler, 'listener', None)
+        if listener is not None:
+            handlers.extend(listener.handlers)
+    formatter = next((handler.formatter for handler in handlers
+                      if handler.formatter is not None), None)
+    if formatter is None:
+        formatter = RedactingFormatter(fields=PII_FIELDS)
+    return formatter
+
+
+def redact_lines(logger: logging.Logger, messages: Iterable[str],
+                 redacted: bool = False) -> Iterator[str]:
+    """
+    Formats messages as `logger` would, with redaction, without writing them.
+
+    The logger's filters are not applied: every message is data to export,
+    and sampling (see `SamplingFilter`) is meant for diagnostic log calls.
+
+    Args:
+        logger (logging.Logger): The logger whose formatter is applied.
+        messages (Iterable[str]): The messages to format.
+        redacted (bool): Whether the messages are already redacted (e.g. by
+            `redact_batch`), in which case only the log format is applied.
+
+    Yields:
+        str: Each message formatted and redacted.
+    """
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    formatter = _logger_formatter(logger)
+    for message in messages:
+        record = logger.makeRecord(logger.name, logging.INFO, __file__, 0,
+                                   message, None, None)
+        if redacted:
+            yield logging.Formatter.format(formatter, record)
+        else:
+            yield formatter.format(record)
+
+
+def write_batches(lines: Iterable[str], out: TextIO,
+                  batch_size: int = STREAM_BATCH_SIZE) -> int:
+    """
+    Writes lines to a stream, one write call per batch of lines.
+
+    Args:
+        lines (Iterable[str]): The lines to write, without line terminators.
+        out (TextIO): The stream to write to.
+        batch_size (int): The number of lines grouped into a single write.
+
+    Returns:
+        int: The number of lines written.
+    """
+    count = 0
+    batch = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= batch_size:
+            out.write("\n".join(batch) + "\n")
+            count += len(batch)
+            batch = []
+    if batch:
+        out.write("\n".join(batch) + "\n")
+        count += len(batch)
+    out.flush()
+    return count
+
+
+def redacted_select(db, table: str = "users",
+                    fields: Sequence[str] = PII_FIELDS,
+                    redaction: str = RedactingFormatter.REDACTION) -> str:
+    """
+    Builds a SELECT that redacts PII columns on the database server.
+
+    The column list is taken from the table's metadata. Every column whose
+    name `filter_datum` would redact (i.e. ending with one of `fields`) is
+    projected as the redaction literal, so its value never leaves the
+    database, while the other columns are selected as they are.
+
+    Args:
+        db: An open database connection.
+        table (str): The table to select from.
+        fields (Sequence[str]): The field names to be redacted.
+        redaction (str): The literal projected in place of PII values.
+
+    Returns:
+        str: The SELECT statement.
+    """
+    cursor = db.cursor()
+    try:
+        cursor.execute("SELECT * FROM `{}` LIMIT 0".format(table))
+        cursor.fetchall()
+        columns = [description[0] for description in cursor.description]
+    finally:
+        cursor.close()
+    literal = "'{}'".format(redaction.replace("'", "''"))
+    projection = ", ".join(
+        "{} AS `{}`".format(literal, column)
+        if _is_pii_column(column, fields) else "`{}`".format(column)
+        for column in columns)
+    return "SELECT {} FROM `{}`".format(projection, table)
+
+
+def stream_users(db, batch_size: int = STREAM_BATCH_SIZE,
+                 out: TextIO = None, push_down: bool = False,
+                 columnar: bool = False) -> int:
+    """
+    Streams the 'users' table through the redacting logger.
+
+    Rows are read from an unbuffered cursor with `fetchmany`, rendered as
+    `field=value;` messages, formatted by the `get_logger()` formatter and
+    written out in batches, so memory stays flat whatever the table size.
+
+    Args:
+        db: An open database connection.
+        batch_size (int): The number of rows fetched and written at a time.
+        out (TextIO): The stream to write to, `sys.stderr` by default.
+        push_down (bool): Whether PII columns are redacted by the database
+            server, see `redacted_select`.
+        columnar (bool): Whether each fetched batch is redacted column-wise
+            by `redact_batch` instead of line by line.
+
+    Returns:
+        int: The number of rows written.
+    """
+    logger = get_logger()
+    # The fields of the live formatter, which follow the field registry
+    fields = getattr(_logger_formatter(logger), 'fields', PII_FIELDS)
+    query = (redacted_select(db, fields=fields) if push_down
+             else "SELECT * FROM users")
+    cursor = db.cursor(buffered=False)
+    try:
+        cursor.execute(query)
+        columns = [description[0] for description in cursor.description]
+        if columnar:
+            messages = (message
+                        for rows in iter_batches(cursor, batch_size)
+                        for message in redact_batch(columns, rows, fields))
+        else:
+            messages = (format_row(columns, row)
+                        for row in iter_rows(cursor, batch_size))
+        return write_batches(redact_lines(logger, messages, columnar),
+                             out if out is not None else sys.stderr,
+                             batch_size)
+    finally:
+        cursor.close()
+
+
+def key_ranges(db, shards: int, table: str = "users",
+               key: str = "id") -> List[Tuple[int, int]]:
+    """
+    Splits a table into contiguous ranges of its integer key.
+
+    Args:
+        db: An open database connection.
+        shards (int): The number of ranges to produce.
+        table (str): The table to split.
+        key (str): The integer primary key column.
+
+    Returns:
+        List[Tuple[int, int]]: Half-open `[low, high)` ranges, in key order,
+        covering every row of the table (empty if the table is empty).
+    """
+    cursor = db.cursor()
+    try:
+        cursor.execute("SELECT MIN(`{0}`), MAX(`{0}`) FROM `{1}`".format(
+            key, table))
+        low, high = cursor.fetchone()
+    finally:
+        cursor.close()
+    if low is None:
+        return []
+    low, high = int(low), int(high) + 1
+    step = max(1, -(-(high - low) // shards))
+    return [(start, min(start + step, high))
+            for start in range(low, high, step)]
+
+
+def _print_progress(stats: Dict[str, Any]) -> None:
+    """
+    Default progress reporter of `export_users`, one line per finished shard.
+    """
+    if stats['done']:
+        print("shard {shard}: {rows} rows in {seconds:.2f}s "
+              "({rows_per_sec:.0f} rows/s)".format(**stats), file=sys.stderr)
+
+
+def _export_shard(pool: ConnectionPool, shard: int, low: int, high: int,
+                  path: str, key: str, push_down: bool, batch_size: int,
+                  progress: Callable[[Dict[str, Any]], None]
+                  ) -> Dict[str, Any]:
+    """
+    Exports one key range of the 'users' table to a file, in a worker thread.
+    """
+    logger = get_logger()
+    fields = getattr(_logger_formatter(logger), 'fields', PII_FIELDS)
+    started = time.monotonic()
+    stats = {'shard': shard, 'rows': 0, 'seconds': 0.0,
+             'rows_per_sec': 0.0, 'done': False}
+    with pool.connection() as db:
+        query = (redacted_select(db, fields=fields) if push_down
+                 else "SELECT * FROM users")
+        query += " WHERE `{0}` >= {1} AND `{0}` < {2} ORDER BY `{0}`".format(
+            key, int(low), int(high))
+        cursor = db.cursor()
+        try:
+            cursor.execute(query)
+            columns = [description[0] for description in cursor.description]
+            with open(path, 'w') as out:
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    messages = (format_row(columns, row) for row in rows)
+                    stats['rows'] += write_batches(
+                        redact_lines(logger, messages), out, batch_size)
+                    progress(_shard_stats(stats, started))
+        finally:
+            cursor.close()
+    stats['done'] = True
+    progress(_shard_stats(stats, started))
+    return stats
+
+
+def _shard_stats(stats: Dict[str, Any], started: float) -> Dict[str, Any]:
+    """
+    Refreshes the timing fields of shard stats and returns a copy of them.
+    """
+    stats['seconds'] = time.monotonic() - started
+    stats['rows_per_sec'] = (stats['rows'] / stats['seconds']
+                             if stats['seconds'] else 0.0)
+    return dict(stats)
+
+
+def export_users(output: str, shards: int = EXPORT_SHARDS,
+                 workers: int = None, per_shard: bool = False,
+                 key: str = "id", push_down: bool = False,
+                 batch_size: int = STREAM_BATCH_SIZE,
+                 pool: ConnectionPool = None,
+                 progress: Callable[[Dict[str, Any]], None] = None
+                 ) -> List[Dict[str, Any]]:
+    """
+    Exports the 'users' table in parallel, sharded by primary-key range.
+
+    Each key range is read on its own pooled connection by a worker thread,
+    rendered as `field=value;` lines and redacted with the `get_logger()`
+    formatter. Shards are either kept as separate files or concatenated in
+    key order into a single output.
+
+    Args:
+        output (str): The output file, or the prefix of the shard files.
+        shards (int): The number of key ranges.
+        workers (int): The number of worker threads, one per shard by
+            default.
+        per_shard (bool): When True, shard `n` is written to `output.n`
+            instead of being merged into `output`.
+        key (str): The integer primary key column of the table.
+        push_down (bool): Whether PII columns are redacted by the database
+            server, see `redacted_select`.
+        batch_size (int): The number of rows fetched and written at a time.
+        pool (ConnectionPool): The connection pool, `get_db_pool()` by
+            default.
+        progress (Callable): Called with a stats dict (`shard`, `rows`,
+            `seconds`, `rows_per_sec`, `done`) after each batch of each
+            shard. By default a line is printed when a shard is done.
+
+    Returns:
+        List[Dict[str, Any]]: The final stats of every shard, in key order.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    pool = pool if pool is not None else get_db_pool()
+    progress = progress if progress is not None else _print_progress
+    with pool.connection() as db:
+        ranges = key_ranges(db, shards, key=key)
+    paths = ["{}.{}".format(output, shard) for shard in range(len(ranges))]
+    try:
+        with ThreadPoolExecutor(max_workers=workers or len(ranges) or 1) \
+                as ex:
+            futures = [ex.submit(_export_shard, pool, shard, low, high,
+                                 paths[shard], key, push_down, batch_size,
+                                 progress)
+                       for shard, (low, high) in enumerate(ranges)]
+            results = [future.result() for future in futures]
+        if not per_shard:
+            with open(output, 'w') as out:
+                for path in paths:
+                    with open(path, 'r') as shard_file:
+                        shutil.copyfileobj(shard_file, out)
+    finally:
+        # Shard files are only intermediate when merging, even on failure
+        if not per_shard:
+            for path in paths:
+                if os.path.exists(path):
+                    os.remove(path)
+    return results
+
+
+def main(stream: bool = False, batch_size: int = STREAM_BATCH_SIZE,
+         push_down: bool = False, columnar: bool = False) -> None:
     """
     The main function retrieves all records from the 'users' table in a
     secure database and processes them.
@@ -188,6 +1925,17 @@ def main() -> None:
         When running this script directly, the `main` function will be executed
         to fetch and display all records from the 'users' table.
 
+    Args:
+        stream (bool): When True, rows are streamed in batches through the
+            redacting logger by `stream_users` instead of being fetched all
+            at once.
+        batch_size (int): The batch size used in streaming mode.
+        push_down (bool): When True, PII columns are replaced by the
+            redaction literal in the SELECT itself (see `redacted_select`),
+            so their values are never sent by the database.
+        columnar (bool): When True, streamed batches are redacted
+            column-wise by `redact_batch`.
+
     Returns:
         None
 
@@ -207,6 +1955,14 @@ def main() -> None:
     # Establish a connection to the database
     my_db = get_db()
 
+    if stream:
+        try:
+            stream_users(my_db, batch_size, push_down=push_down,
+                         columnar=columnar)
+        finally:
+            my_db.close()
+        return
+
     # Get the logger to log data processing steps
     logger = get_logger()
 
@@ -214,7 +1970,8 @@ def main() -> None:
     cursor = my_db.cursor()
 
     # Execute an SQL query to fetch all rows from the 'users' table
-    cursor.execute("SELECT * FROM users")
+    cursor.execute(redacted_select(my_db) if push_down
+                   else "SELECT * FROM users")
     rows = cursor.fetchall()
 
     # Iterate through the result set and print each row
@@ -232,6 +1989,8 @@ def hash_password(password: str) -> bytes:
     Returns:
         bytes: The salted, hashed password as a byte string.
     """
+    import bcrypt
+
     salt = bcrypt.gensalt()
     hashed = bcrypt.hashpw(password.encode(), salt)
     return hashed
@@ -249,8 +2008,256 @@ def is_valid(hashed_password: bytes, password: str) -> bool:
         bool: True if the password matches the hashed password,
         False otherwise.
     """
+    import bcrypt
+
     return bcrypt.checkpw(password.encode(), hashed_password)
 
 
+def _bounded_map(func: Callable, items: Iterable,
+                 workers: int = None) -> Iterator:
+    """
+    Maps `func` over `items` on a thread pool, yielding results in order.
+
+    At most `workers` calls run at once and only a small window of pending
+    results is kept, so arbitrarily long iterables can be processed.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    workers = workers or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for item in items:
+            pending.append(executor.submit(func, item))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _is_valid_pair(pair: Tuple[bytes, str]) -> bool:
+    """
+    Unpacks a (hashed_password, password) pair for `is_valid`.
+    """
+    return is_valid(*pair)
+
+
+def hash_passwords(passwords: Iterable[str],
+                   workers: int = None) -> List[bytes]:
+    """
+    Hashes many passwords concurrently.
+
+    bcrypt releases the GIL while hashing, so a thread pool uses several
+    cores; `workers` caps how many hashes run at once.
+
+    Args:
+        passwords (Iterable[str]): The plain text passwords to hash.
+        workers (int): The maximum number of concurrent hashes, the CPU
+            count by default.
+
+    Returns:
+        List[bytes]: The hashed passwords, in the order of `passwords`.
+    """
+    return list(_bounded_map(hash_password, passwords, workers))
+
+
+def verify_many(pairs: Iterable[Tuple[bytes, str]],
+                workers: int = None) -> List[bool]:
+    """
+    Validates many passwords concurrently.
+
+    Args:
+        pairs (Iterable[Tuple[bytes, str]]): (hashed_password, password)
+            pairs, as taken by `is_valid`.
+        workers (int): The maximum number of concurrent checks, the CPU
+            count by default.
+
+    Returns:
+        List[bool]: Whether each password matches, in the order of `pairs`.
+    """
+    return list(_bounded_map(_is_valid_pair, pairs, workers))
+
+
+async def hash_passwords_async(passwords: Iterable[str],
+                               workers: int = None) -> List[bytes]:
+    """
+    Awaitable form of `hash_passwords`, which does not block the event loop.
+
+    Args:
+        passwords (Iterable[str]): The plain text passwords to hash.
+        workers (int): The maximum number of concurrent hashes.
+
+    Returns:
+        List[bytes]: The hashed passwords, in the order of `passwords`.
+    """
+    import asyncio
+
+    return await asyncio.get_running_loop().run_in_executor(
+        None, hash_passwords, list(passwords), workers)
+
+
+async def verify_many_async(pairs: Iterable[Tuple[bytes, str]],
+                            workers: int = None) -> List[bool]:
+    """
+    Awaitable form of `verify_many`, which does not block the event loop.
+
+    Args:
+        pairs (Iterable[Tuple[bytes, str]]): (hashed_password, password)
+            pairs, as taken by `is_valid`.
+        workers (int): The maximum number of concurrent checks.
+
+    Returns:
+        List[bool]: Whether each password matches, in the order of `pairs`.
+    """
+    import asyncio
+
+    return await asyncio.get_running_loop().run_in_executor(
+        None, verify_many, list(pairs), workers)
+
+
+def iter_chunks(path: str, chunk_size: int = REDACT_CHUNK_SIZE
+                ) -> Iterator[Tuple[int, int]]:
+    """
+    Splits a file into newline-aligned byte ranges.
+
+    The file is memory-mapped, so only the pages around each boundary are
+    touched while the ranges are computed.
+
+    Args:
+        path (str): The path of the file to split.
+        chunk_size (int): The approximate size of each range, in bytes.
+
+    Yields:
+        Tuple[int, int]: The start and end offsets of each range; every
+        range but the last ends right after a newline.
+    """
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = 0
+            while start < size:
+                end = mm.find(b"\n", min(start + chunk_size, size) - 1)
+                end = size if end == -1 else end + 1
+                yield start, end
+                start = end
+
+
+def _redact_chunk(path: str, start: int, end: int, fields: Tuple[str, ...],
+                  redaction: str, separator: str) -> bytes:
+    """
+    Redacts one byte range of a file, in a worker process.
+
+    Newlines are added to the value terminators so that a value is never
+    considered to run into the next line.
+    """
+    redactor = get_redactor(fields, redaction, separator + "\n")
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            text = mm[start:end].decode('utf-8', 'surrogateescape')
+    return redactor.redact(text).encode('utf-8', 'surrogateescape')
+
+
+def redact_file(input_path: str, output_path: str,
+                fields: Sequence[str] = PII_FIELDS,
+                redaction: str = RedactingFormatter.REDACTION,
+                separator: str = RedactingFormatter.SEPARATOR,
+                workers: int = None,
+                chunk_size: int = REDACT_CHUNK_SIZE) -> int:
+    """
+    Redacts an existing log file in parallel, using `filter_datum` rules.
+
+    The input is memory-mapped and split into newline-aligned chunks that
+    are redacted by a pool of processes. Chunks are written out in their
+    original order, and at most a few chunks per worker are held in memory.
+
+    Args:
+        input_path (str): The log file to scrub.
+        output_path (str): The file the redacted log is written to.
+        fields (Sequence[str]): The field names to be redacted.
+        redaction (str): The string to replace the field values with.
+        separator (str): The character separating field-value pairs.
+        workers (int): The number of processes, the CPU count by default.
+        chunk_size (int): The approximate size of each chunk, in bytes.
+
+    Returns:
+        int: The number of bytes written.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    fields = tuple(fields)
+    workers = workers or os.cpu_count() or 1
+    written = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor, \
+            open(output_path, 'wb') as out:
+        pending = deque()
+        for start, end in iter_chunks(input_path, chunk_size):
+            pending.append(executor.submit(_redact_chunk, input_path, start,
+                                           end, fields, redaction,
+                                           separator))
+            if len(pending) >= 2 * workers:
+                written += out.write(pending.popleft().result())
+        while pending:
+            written += out.write(pending.popleft().result())
+    return written
+
+
+def cli(argv: List[str] = None) -> None:
+    """
+    Command-line entry point.
+
+    Without a command, the 'users' table is dumped through `main`. The
+    `redact` command scrubs an existing log file with `redact_file`.
+
+    Args:
+        argv (List[str]): The arguments, `sys.argv[1:]` by default.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Dump the users table or redact existing log files.")
+    parser.add_argument('--stream', action='store_true',
+                        help="stream the users table in batches")
+    parser.add_argument('--batch-size', type=int, default=STREAM_BATCH_SIZE,
+                        help="rows fetched and written per batch")
+    parser.add_argument('--push-down', action='store_true',
+                        help="redact PII columns in the SELECT itself")
+    parser.add_argument('--columnar', action='store_true',
+                        help="redact streamed batches column-wise")
+    commands = parser.add_subparsers(dest='command')
+    redact = commands.add_parser('redact', help="redact an existing log file")
+    redact.add_argument('input', help="log file to redact")
+    redact.add_argument('output', help="file to write the redacted log to")
+    redact.add_argument('--fields', nargs='+', default=list(PII_FIELDS),
+                        help="field names to redact")
+    redact.add_argument('--redaction', default=RedactingFormatter.REDACTION)
+    redact.add_argument('--separator', default=RedactingFormatter.SEPARATOR)
+    redact.add_argument('--workers', type=int, default=None,
+                        help="number of worker processes")
+    redact.add_argument('--chunk-size', type=int, default=REDACT_CHUNK_SIZE,
+                        help="approximate chunk size in bytes")
+    export = commands.add_parser(
+        'export', help="export the users table in parallel shards")
+    export.add_argument('output', help="output file or shard file prefix")
+    export.add_argument('--shards', type=int, default=EXPORT_SHARDS,
+                        help="number of primary-key ranges")
+    export.add_argument('--workers', type=int, default=None,
+                        help="number of worker threads")
+    export.add_argument('--per-shard', action='store_true',
+                        help="write one file per shard")
+    export.add_argument('--key', default='id', help="integer primary key")
+    args = parser.parse_args(argv)
+
+    if args.command == 'redact':
+        redact_file(args.input, args.output, args.fields, args.redaction,
+                    args.separator, args.workers, args.chunk_size)
+    elif args.command == 'export':
+        export_users(args.output, args.shards, args.workers, args.per_shard,
+                     args.key, args.push_down, args.batch_size)
+    else:
+        main(stream=args.stream, batch_size=args.batch_size,
+             push_down=args.push_down, columnar=args.columnar)
+
+
 if __name__ == "__main__":
-    main()
+    cli()
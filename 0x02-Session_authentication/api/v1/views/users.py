@@ -2,18 +2,58 @@
 """ Module of Users views
 """
 from api.v1.views import app_views
-from flask import abort, jsonify, request
+from flask import (abort, jsonify, request, Response,
+                   stream_with_context)
+from models.base import LIMIT_ERROR, PAGE_SIZE
 from models.user import User
+import json
 
 
 @app_views.route('/users', methods=['GET'], strict_slashes=False)
 def view_all_users() -> str:
     """ GET /api/v1/users
+    Query parameters (optional):
+      - limit: number of users per page, at most MAX_PAGE_SIZE (1000)
+      - cursor: `next_cursor` of the previous page
     Return:
-      - list of all User objects JSON represented
+      - without limit and cursor: list of all User objects JSON
+        represented, streamed in chunks
+      - otherwise: {"users": one page of User objects JSON represented,
+        "next_cursor": token of the next page, null after the last one}
+      - 400 if limit or cursor is invalid
     """
-    all_users = [user.to_json() for user in User.all()]
-    return jsonify(all_users)
+    limit = request.args.get('limit')
+    cursor = request.args.get('cursor')
+    if limit is None and cursor is None:
+        return Response(stream_with_context(_stream_users()),
+                        mimetype='application/json')
+    try:
+        limit = int(limit) if limit is not None else PAGE_SIZE
+    except ValueError:
+        return jsonify({'error': LIMIT_ERROR}), 400
+    try:
+        users, next_cursor = User.page(limit=limit, cursor=cursor)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'users': [user.to_json() for user in users],
+                    'next_cursor': next_cursor})
+
+
+def _stream_users(chunk_size: int = PAGE_SIZE):
+    """ JSON array of all users, yielded `chunk_size` users at a time
+    """
+    yield "["
+    chunk = []
+    first = True
+    for user in User.iter_search():
+        chunk.append(json.dumps(user.to_json()))
+        if len(chunk) == chunk_size:
+            yield ("" if first else ",") + ",".join(chunk)
+            first = False
+            chunk = []
+    if chunk:
+        yield ("" if first else ",") + ",".join(chunk)
+    yield "]"
 
 
 @app_views.route('/users/<user_id>', methods=['GET'], strict_slashes=False)
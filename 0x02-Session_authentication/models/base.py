@@ -1,27 +1,109 @@
 #!/usr/bin/env python3
 """ Base module
 """
-from datetime import datetime
-from typing import TypeVar, List, Iterable
-from os import path
+from datetime import datetime, timedelta
+from typing import TypeVar, List, Iterable, Iterator, Tuple
+from os import path, getenv
+import atexit
+import base64
+import binascii
+import bisect
 import json
+import os
+import sys
+import tempfile
+import threading
 import uuid
 
 
 TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S"
 DATA = {}
+RAW = {}
+ORDER = {}
+INDEXES = {}
+DIRTY = {}
+JOURNAL_COMPACT_BYTES = 1024 * 1024
+LOAD_CHUNK_SIZE = 64 * 1024
+PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+LIMIT_ERROR = "limit must be an integer between 1 and {}".format(
+    MAX_PAGE_SIZE)
+JSON_SCALARS = (str, int, float, bool, type(None))
+DURABILITY_MODES = ('commit', 'interval', 'exit')
+SERIALIZED_ATTR = '_Base__serialized'
+EPOCH = datetime(1970, 1, 1)
+_flush_cond = threading.Condition()
+_write_lock = threading.RLock()
+_store_lock = threading.RLock()
+_flusher = None
+
+
+def _check_durability(durability: str) -> str:
+    """ Return a durability mode, raising ValueError if it is unknown
+    """
+    if durability not in DURABILITY_MODES:
+        raise ValueError("durability must be one of {}".format(
+            ", ".join(DURABILITY_MODES)))
+    return durability
 
 
 class Base():
     """ Base class
+
+    Objects are persisted in `.db_<Class>.json`. In journal mode (`journal`
+    set, or DB_JOURNAL=1 in the environment), `save` and `remove` append one
+    line to `.db_<Class>.journal` instead of rewriting the whole file; the
+    journal is replayed on load and compacted into the snapshot once it
+    grows past `journal_compact_bytes`.
+
+    Snapshot writes follow `durability` (DB_DURABILITY in the environment):
+        - 'commit': every `save`/`remove` rewrites the file before
+          returning.
+        - 'interval': writes only mark the class dirty; a background thread
+          writes the file every `flush_interval` seconds, or as soon as
+          `flush_pending` writes are pending, coalescing them into one.
+        - 'exit': the file is only written by `flush` or at exit.
+    Dirty classes are always flushed when the interpreter exits.
+
+    Loading is lazy: `load_from_file` parses the file incrementally and only
+    keeps the JSON text of each object in RAW; an instance is built on its
+    first `get`/`search` hit and then lives in DATA. ORDER keeps the sorted
+    ids of each class, for `page`.
+
+    Subclasses can list attributes in `indexed_attributes` to get a hash
+    index (value -> ids) that `search` uses instead of a full scan. Indexes
+    follow `save`, `remove` and assignments to stored objects.
+
+    Instances of subclasses keep their attributes in `__dict__`; see
+    `CompactBase` for a `__slots__` based storage. `Base` declares no
+    storage itself (so that `CompactBase` subclasses have no `__dict__`),
+    hence it can only be instantiated through a subclass.
+
+    The store is shared by threads: changes to DATA, RAW and INDEXES are
+    made under `_store_lock`, and file writes under `_write_lock` (always
+    taken before `_store_lock`). Reads never wait for file writes: a `get`
+    of a built object takes no lock, and reads that copy the class maps or
+    build a raw object only hold `_store_lock` for that in-memory work.
+    `search`/`all` thus see a consistent snapshot while other threads save
+    and remove objects.
     """
+    __slots__ = ()
+    indexed_attributes = ()
+    journal = getenv('DB_JOURNAL', '0') == '1'
+    journal_compact_bytes = int(getenv('DB_JOURNAL_COMPACT_BYTES',
+                                       JOURNAL_COMPACT_BYTES))
+    durability = _check_durability(getenv('DB_DURABILITY', 'commit'))
+    flush_interval = float(getenv('DB_FLUSH_INTERVAL', '1.0'))
+    flush_pending = int(getenv('DB_FLUSH_PENDING', '100'))
 
     def __init__(self, *args: list, **kwargs: dict):
         """ Initialize a Base instance
         """
+        if type(self) is Base:
+            raise TypeError("Base has no attribute storage: instantiate a "
+                            "subclass of it")
         s_class = str(self.__class__.__name__)
-        if DATA.get(s_class) is None:
-            DATA[s_class] = {}
+        DATA.setdefault(s_class, {})
 
         self.id = kwargs.get('id', str(uuid.uuid4()))
         if kwargs.get('created_at') is not None:
@@ -35,6 +117,99 @@ class Base():
         else:
             self.updated_at = datetime.utcnow()
 
+    def __setattr__(self, name: str, value):
+        """ Set an attribute, keeping the indexes of stored objects in sync
+        and invalidating the cached serialization
+        """
+        if name not in self.indexed_attributes:
+            super().__setattr__(name, value)
+        else:
+            with _store_lock:
+                stored = self._is_stored()
+                if stored:
+                    self.__class__._unindex(self, (name,))
+                super().__setattr__(name, value)
+                if stored:
+                    self.__class__._index(self, (name,))
+        # Invalidated after the change, see `serialized`
+        if getattr(self, SERIALIZED_ATTR, None) is not None:
+            with _store_lock:
+                object.__setattr__(self, SERIALIZED_ATTR, None)
+
+    def _is_stored(self) -> bool:
+        """ Whether this instance is the one held in DATA for its id
+        """
+        objs = DATA.get(self.__class__.__name__)
+        return objs is not None and \
+            objs.get(getattr(self, 'id', None)) is self
+
+    @classmethod
+    def _indexes(cls) -> dict:
+        """ Indexes of the class: attribute -> value -> {id: None}
+        """
+        s_class = cls.__name__
+        indexes = INDEXES.get(s_class)
+        if indexes is None:
+            with _store_lock:
+                if INDEXES.get(s_class) is None:
+                    INDEXES[s_class] = {attr: {}
+                                        for attr in cls.indexed_attributes}
+                indexes = INDEXES[s_class]
+        return indexes
+
+    @staticmethod
+    def _value(obj, attr: str):
+        """ Attribute of an instance, or key of a raw JSON dictionary
+        """
+        if isinstance(obj, dict):
+            return obj.get(attr)
+        return getattr(obj, attr, None)
+
+    @classmethod
+    def _index(cls, obj, attrs: Iterable[str] = None):
+        """ Add an object (or its raw JSON dictionary) to the indexes of the
+        given attributes
+        """
+        indexes = cls._indexes()
+        obj_id = cls._value(obj, 'id')
+        for attr in attrs if attrs is not None else cls.indexed_attributes:
+            value = cls._value(obj, attr)
+            try:
+                indexes[attr].setdefault(value, {})[obj_id] = None
+            except TypeError:
+                # Unhashable values are only found by a full scan
+                pass
+
+    @classmethod
+    def _unindex(cls, obj, attrs: Iterable[str] = None):
+        """ Remove an object (or its raw JSON dictionary) from the indexes of
+        the given attributes
+        """
+        indexes = cls._indexes()
+        obj_id = cls._value(obj, 'id')
+        for attr in attrs if attrs is not None else cls.indexed_attributes:
+            value = cls._value(obj, attr)
+            try:
+                ids = indexes[attr].get(value)
+            except TypeError:
+                continue
+            if ids is not None:
+                ids.pop(obj_id, None)
+                if not ids:
+                    del indexes[attr][value]
+
+    @classmethod
+    def rebuild_indexes(cls):
+        """ Rebuild the indexes from all stored objects
+        """
+        s_class = cls.__name__
+        with _store_lock:
+            INDEXES[s_class] = None
+            for obj in list(DATA[s_class].values()):
+                cls._index(obj)
+            for raw in list(RAW.get(s_class, {}).values()):
+                cls._index(json.loads(raw))
+
     def __eq__(self, other: TypeVar('Base')) -> bool:
         """ Equality
         """
@@ -44,94 +219,654 @@ class Base():
             return False
         return (self.id == other.id)
 
+    def _attributes(self) -> Iterable[tuple]:
+        """ (name, value) pairs of the instance attributes
+        """
+        return self.__dict__.items()
+
     def to_json(self, for_serialization: bool = False) -> dict:
         """ Convert the object a JSON dictionary
         """
         result = {}
-        for key, value in self.__dict__.items():
+        for key, value in self._attributes():
             if not for_serialization and key[0] == '_':
                 continue
+            if key == SERIALIZED_ATTR:
+                continue
             if type(value) is datetime:
                 result[key] = value.strftime(TIMESTAMP_FORMAT)
             else:
                 result[key] = value
         return result
 
+    def serialized(self) -> str:
+        """ JSON form of `to_json(True)`, cached until an attribute changes
+
+        In-place changes of mutable attribute values are not tracked: assign
+        the attribute again to invalidate the cache.
+        """
+        cached = getattr(self, SERIALIZED_ATTR, None)
+        if type(cached) is str:
+            return cached
+        # The token is replaced if another thread changes an attribute while
+        # this one serializes, and the then stale result is not cached
+        token = object()
+        object.__setattr__(self, SERIALIZED_ATTR, token)
+        cached = json.dumps(self.to_json(True))
+        with _store_lock:
+            if getattr(self, SERIALIZED_ATTR, None) is token:
+                object.__setattr__(self, SERIALIZED_ATTR, cached)
+        return cached
+
     @classmethod
     def load_from_file(cls):
-        """ Load all objects from file
+        """ Load all objects from file, then replay the journal
+
+        Objects are not built here: only their JSON text is kept in RAW,
+        see `get`.
         """
         s_class = cls.__name__
         file_path = ".db_{}.json".format(s_class)
-        DATA[s_class] = {}
-        if not path.exists(file_path):
+        with _store_lock:
+            DATA[s_class] = {}
+            RAW[s_class] = {}
+            INDEXES[s_class] = None
+            if path.exists(file_path):
+                with open(file_path, 'r') as f:
+                    for obj_id, obj_json, raw in _iter_json_items(f):
+                        RAW[s_class][obj_id] = raw
+                        cls._index(obj_json)
+            ORDER[s_class] = sorted(RAW[s_class])
+        cls.replay_journal()
+
+    @classmethod
+    def replay_journal(cls):
+        """ Apply the journal entries on top of the loaded objects
+        """
+        s_class = cls.__name__
+        journal_path = ".db_{}.journal".format(s_class)
+        if not path.exists(journal_path):
             return
 
-        with open(file_path, 'r') as f:
-            objs_json = json.load(f)
-            for obj_id, obj_json in objs_json.items():
-                DATA[s_class][obj_id] = cls(**obj_json)
+        torn = False
+        with _store_lock, open(journal_path, 'r') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Torn last line of an interrupted append
+                    torn = True
+                    break
+                cls._discard(entry['id'])
+                if entry['op'] == 'save':
+                    RAW[s_class][entry['id']] = json.dumps(entry['obj'])
+                    cls._index(entry['obj'])
+                    cls._track(entry['id'])
+                else:
+                    cls._untrack(entry['id'])
+        if torn:
+            # Compact so that new entries are not appended after it
+            cls.save_to_file()
+
+    @classmethod
+    def _track(cls, obj_id: str):
+        """ Add an id to the sorted ids of the class, if missing
+        """
+        with _store_lock:
+            order = ORDER.setdefault(cls.__name__, [])
+            pos = bisect.bisect_left(order, obj_id)
+            if pos == len(order) or order[pos] != obj_id:
+                order.insert(pos, obj_id)
+
+    @classmethod
+    def _untrack(cls, obj_id: str):
+        """ Remove an id from the sorted ids of the class, if present
+        """
+        with _store_lock:
+            order = ORDER.setdefault(cls.__name__, [])
+            pos = bisect.bisect_left(order, obj_id)
+            if pos < len(order) and order[pos] == obj_id:
+                del order[pos]
+
+    @classmethod
+    def _discard(cls, obj_id: str):
+        """ Forget a stored object, built or raw, and its index entries
+        """
+        s_class = cls.__name__
+        with _store_lock:
+            obj = DATA[s_class].pop(obj_id, None)
+            raw = RAW.setdefault(s_class, {}).pop(obj_id, None)
+            if obj is not None:
+                cls._unindex(obj)
+            if raw is not None:
+                cls._unindex(json.loads(raw))
+
+    @classmethod
+    def _materialize(cls, obj_id: str) -> TypeVar('Base'):
+        """ Build the instance of a raw object and move it to DATA
+        """
+        s_class = cls.__name__
+        with _store_lock:
+            raw = RAW.get(s_class, {}).pop(obj_id, None)
+            if raw is None:
+                return DATA[s_class].get(obj_id)
+            obj = cls(**json.loads(raw))
+            object.__setattr__(obj, SERIALIZED_ATTR, raw)
+            DATA[s_class][obj_id] = obj
+            return obj
 
     @classmethod
     def save_to_file(cls):
         """ Save all objects to file
+
+        The file is assembled from the cached serialization of each object,
+        so only objects changed since the last write are serialized again.
+        It is written to a temporary file that atomically replaces the
+        previous one, so a crash mid-write never loses the store. Writes are
+        serialized, so an older snapshot never replaces a newer one.
+        """
+        with _write_lock:
+            cls._write_snapshot()
+
+    @classmethod
+    def _write_snapshot(cls):
+        """ Write the file from a snapshot of the store, see `save_to_file`
         """
         s_class = cls.__name__
         file_path = ".db_{}.json".format(s_class)
-        objs_json = {}
-        for obj_id, obj in DATA[s_class].items():
-            objs_json[obj_id] = obj.to_json(True)
+        with _store_lock:
+            objs = list(DATA[s_class].items())
+            raws = list(RAW.get(s_class, {}).items())
+        fragments = ["{}: {}".format(json.dumps(obj_id), obj.serialized())
+                     for obj_id, obj in objs]
+        fragments += ["{}: {}".format(json.dumps(obj_id), raw)
+                      for obj_id, raw in raws]
+
+        fd, tmp_path = tempfile.mkstemp(
+            prefix=".db_{}.".format(s_class), suffix=".tmp",
+            dir=path.dirname(path.abspath(file_path)))
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write("{" + ", ".join(fragments) + "}")
+                f.flush()
+                os.fsync(f.fileno())
+            if path.exists(file_path):
+                os.chmod(tmp_path, os.stat(file_path).st_mode & 0o777)
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        # The snapshot now holds every journaled change
+        journal_path = ".db_{}.journal".format(s_class)
+        if path.exists(journal_path):
+            os.remove(journal_path)
+
+    @classmethod
+    def append_to_journal(cls, op: str, obj_id: str, obj_json: dict = None):
+        """ Append one change to the journal, compacting it when too big
+        """
+        journal_path = ".db_{}.journal".format(cls.__name__)
+        entry = {'op': op, 'id': obj_id}
+        if obj_json is not None:
+            entry['obj'] = obj_json
+        with _write_lock:
+            with open(journal_path, 'a') as f:
+                f.write(json.dumps(entry) + "\n")
+                size = f.tell()
+            if size > cls.journal_compact_bytes:
+                cls.save_to_file()
 
-        with open(file_path, 'w') as f:
-            json.dump(objs_json, f)
+    @classmethod
+    def persist(cls, op: str, obj: TypeVar('Base')):
+        """ Persist one change according to the journal/durability settings
+        """
+        if cls.journal:
+            with _write_lock:
+                # Journal what is stored now: a concurrent change of the
+                # same id may have been made before this one was appended
+                stored = cls.get(obj.id)
+                if stored is None:
+                    cls.append_to_journal('remove', obj.id)
+                else:
+                    cls.append_to_journal('save', obj.id,
+                                          stored.to_json(True))
+        elif cls.durability == 'commit':
+            cls.save_to_file()
+        else:
+            cls.mark_dirty()
+
+    @classmethod
+    def mark_dirty(cls):
+        """ Record a pending write, to be coalesced by the next flush
+        """
+        global _flusher
+        _check_durability(cls.durability)
+        with _flush_cond:
+            pending = DIRTY.get(cls.__name__, (cls, 0))[1] + 1
+            DIRTY[cls.__name__] = (cls, pending)
+            if cls.durability != 'interval':
+                return
+            if _flusher is None:
+                _flusher = threading.Thread(target=_flush_periodically,
+                                            name="base-flusher",
+                                            daemon=True)
+                _flusher.start()
+            if pending >= cls.flush_pending:
+                _flush_cond.notify()
+
+    @classmethod
+    def flush(cls):
+        """ Write the file now if the class has pending writes
+        """
+        with _write_lock:
+            with _flush_cond:
+                dirty = DIRTY.pop(cls.__name__, None)
+            if dirty is not None:
+                cls.save_to_file()
 
     def save(self):
         """ Save current object
         """
         s_class = self.__class__.__name__
+        # Checked before any change, as persisting it would then fail
+        _check_durability(self.durability)
         self.updated_at = datetime.utcnow()
-        DATA[s_class][self.id] = self
-        self.__class__.save_to_file()
+        with _store_lock:
+            self.__class__._discard(self.id)
+            DATA[s_class][self.id] = self
+            self.__class__._index(self)
+            self.__class__._track(self.id)
+        self.__class__.persist('save', self)
 
     def remove(self):
         """ Remove object
         """
         s_class = self.__class__.__name__
-        if DATA[s_class].get(self.id) is not None:
-            del DATA[s_class][self.id]
-            self.__class__.save_to_file()
+        _check_durability(self.durability)
+        with _store_lock:
+            stored = self.id in DATA[s_class] or \
+                self.id in RAW.get(s_class, {})
+            if stored:
+                self.__class__._discard(self.id)
+                self.__class__._untrack(self.id)
+        if stored:
+            self.__class__.persist('remove', self)
 
     @classmethod
     def count(cls) -> int:
         """ Count all objects
         """
         s_class = cls.__name__
-        return len(DATA[s_class].keys())
+        return len(DATA[s_class].keys()) + len(RAW.get(s_class, {}))
 
     @classmethod
     def all(cls) -> Iterable[TypeVar('Base')]:
         """ Return all objects
+
+        See `iter_search` and `page` to go through them without building
+        the whole list.
         """
         return cls.search()
 
     @classmethod
     def get(cls, id: str) -> TypeVar('Base'):
-        """ Return one object by ID
+        """ Return one object by ID, building it if it is still raw
         """
         s_class = cls.__name__
-        return DATA[s_class].get(id)
+        obj = DATA[s_class].get(id)
+        if obj is None:
+            # Checked again under the lock: another thread may have built
+            # it since
+            obj = cls._materialize(id)
+        return obj
+
+    @staticmethod
+    def _matches(obj: TypeVar('Base'), attributes: dict) -> bool:
+        """ Whether an object has all the given attribute values
+        """
+        for k, v in attributes.items():
+            if (getattr(obj, k) != v):
+                return False
+        return True
+
+    @staticmethod
+    def _may_match(raw: str, attributes: dict) -> bool:
+        """ Whether a raw object may have the given attribute values
+
+        Only JSON scalar values of the query are compared with the keys
+        of the same name in the JSON dictionary, which hold the attribute
+        values as given to the constructor; other attributes are left to
+        `_matches`, once the object is built.
+        """
+        if not attributes:
+            return True
+        obj_json = json.loads(raw)
+        for k, v in attributes.items():
+            if type(v) in JSON_SCALARS and k in obj_json and \
+                    obj_json[k] != v:
+                return False
+        return True
+
+    @classmethod
+    def _candidates(cls, attributes: dict) -> dict:
+        """ Ids ({id: None}) allowed by the indexed attributes of a query,
+        or None when no attribute of the query is indexed
+        """
+        candidates = None
+        indexes = cls._indexes()
+        for k, v in attributes.items():
+            if k not in indexes:
+                continue
+            try:
+                ids = indexes[k].get(v, {})
+            except TypeError:
+                continue
+            # Copied at once, as other threads may change the index
+            ids = dict(ids)
+            if candidates is None:
+                candidates = ids
+            else:
+                candidates = {i: None for i in candidates if i in ids}
+        return candidates
+
+    @classmethod
+    def _ids(cls, attributes: dict) -> List[str]:
+        """ Snapshot of the ids that may match a query
+        """
+        candidates = cls._candidates(attributes)
+        if candidates is not None:
+            return list(candidates)
+        s_class = cls.__name__
+        with _store_lock:
+            return list(DATA[s_class]) + list(RAW.get(s_class, {}))
 
     @classmethod
     def search(cls, attributes: dict = {}) -> List[TypeVar('Base')]:
         """ Search all objects with matching attributes
+
+        Indexed attributes of the query narrow the candidates down through
+        their index; the other attributes are then checked one by one.
+        Objects that are still raw are first checked on their JSON
+        dictionary, see `_may_match`, and only built when they may match.
         """
         s_class = cls.__name__
-        def _search(obj):
-            if len(attributes) == 0:
-                return True
-            for k, v in attributes.items():
-                if (getattr(obj, k) != v):
-                    return False
-            return True
-        
-        return list(filter(_search, DATA[s_class].values()))
+        candidates = cls._candidates(attributes)
+        if candidates is None:
+            with _store_lock:
+                objs = list(DATA[s_class].values())
+                raws = list(RAW.get(s_class, {}).items())
+            # Built outside of the lock, which each build takes on its own
+            for obj_id, raw in raws:
+                if cls._may_match(raw, attributes):
+                    obj = cls._materialize(obj_id)
+                    if obj is not None:
+                        objs.append(obj)
+            return [obj for obj in objs if cls._matches(obj, attributes)]
+        objs = (cls.get(obj_id) for obj_id in candidates)
+        return [obj for obj in objs
+                if obj is not None and cls._matches(obj, attributes)]
+
+    @classmethod
+    def iter_search(cls, attributes: dict = {}) -> Iterator[TypeVar('Base')]:
+        """ Generator form of `search`
+
+        Objects are built and checked one at a time, as the generator is
+        consumed, over the ids stored when it started; objects removed in
+        the meantime are skipped.
+        """
+        for obj_id in cls._ids(attributes):
+            obj = cls.get(obj_id)
+            if obj is not None and cls._matches(obj, attributes):
+                yield obj
+
+    @classmethod
+    def _ids_after(cls, after: str, count: int,
+                   ids: List[str] = None) -> List[str]:
+        """ The first `count` ids greater than `after` (all ids when None),
+        from the sorted `ids`, or else from the sorted ids of the class
+        """
+        if ids is not None:
+            pos = bisect.bisect_right(ids, after) if after is not None else 0
+            return ids[pos:pos + count]
+        with _store_lock:
+            order = ORDER.setdefault(cls.__name__, [])
+            pos = bisect.bisect_right(order, after) if after is not None \
+                else 0
+            return order[pos:pos + count]
+
+    @classmethod
+    def page(cls, attributes: dict = {}, limit: int = PAGE_SIZE,
+             cursor: str = None) -> Tuple[List[TypeVar('Base')], str]:
+        """ One page of `search`, in id order
+
+        `cursor` is the continuation token returned with the previous page
+        (None for the first page). Returns the objects of the page and the
+        token of the next one, None after the last page. Pages are keyed
+        on ids, so objects saved or removed between two calls never shift
+        the following pages. `limit` is at most MAX_PAGE_SIZE, so that a
+        page never builds the whole table.
+        """
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ValueError(LIMIT_ERROR)
+        last = _decode_cursor(cursor) if cursor is not None else None
+        candidates = cls._candidates(attributes)
+        ids = sorted(candidates) if candidates is not None else None
+        objs = []
+        more = True
+        while more and len(objs) < limit:
+            chunk = cls._ids_after(last, limit, ids)
+            more = bool(chunk)
+            for obj_id in chunk:
+                last = obj_id
+                obj = cls.get(obj_id)
+                if obj is not None and cls._matches(obj, attributes):
+                    objs.append(obj)
+                    if len(objs) == limit:
+                        break
+        next_cursor = None
+        if more and cls._ids_after(last, 1, ids):
+            next_cursor = _encode_cursor(last)
+        return objs, next_cursor
+
+
+class CompactBase(Base):
+    """ Base class storing its attributes in `__slots__`
+
+    Subclasses declare their attributes in `__slots__` and get no per
+    instance `__dict__` (unless a subclass omits `__slots__`). `created_at`
+    and `updated_at` are kept as integer epoch seconds and only turned into
+    datetimes when read, and string values of `interned_attributes` are
+    interned so that repeated values are stored once.
+
+    `to_json`, `search` and persistence behave as for `Base`; timestamps
+    are only precise to the second, which is also what is persisted.
+    """
+    __slots__ = ('id', '_created_at', '_updated_at', SERIALIZED_ATTR)
+    interned_attributes = ()
+    _slot_attributes = ('id', 'created_at', 'updated_at')
+
+    def __init_subclass__(cls, **kwargs):
+        """ Collect the attributes declared by the subclass slots
+        """
+        super().__init_subclass__(**kwargs)
+        slots = cls.__dict__.get('__slots__', ())
+        if isinstance(slots, str):
+            slots = (slots,)
+        cls._slot_attributes = cls._slot_attributes + tuple(
+            name for name in slots
+            if name not in ('__dict__', '__weakref__'))
+
+    def __setattr__(self, name: str, value):
+        """ Set an attribute, interning the strings of interned attributes
+        """
+        if type(value) is str and name in self.interned_attributes:
+            value = sys.intern(value)
+        super().__setattr__(name, value)
+
+    @property
+    def created_at(self) -> datetime:
+        """ Creation date
+        """
+        return _from_epoch(self._created_at)
+
+    @created_at.setter
+    def created_at(self, value: datetime):
+        """ Store the creation date as epoch seconds
+        """
+        self._created_at = _to_epoch(value)
+
+    @property
+    def updated_at(self) -> datetime:
+        """ Last update date
+        """
+        return _from_epoch(self._updated_at)
+
+    @updated_at.setter
+    def updated_at(self, value: datetime):
+        """ Store the last update date as epoch seconds
+        """
+        self._updated_at = _to_epoch(value)
+
+    def _attributes(self) -> Iterable[tuple]:
+        """ (name, value) pairs of the set slots, then of `__dict__`
+        """
+        for name in self._slot_attributes:
+            try:
+                yield name, getattr(self, name)
+            except AttributeError:
+                continue
+        yield from getattr(self, '__dict__', {}).items()
+
+
+def _to_epoch(value: datetime) -> int:
+    """ Epoch seconds of a naive UTC datetime
+    """
+    if value is None:
+        return None
+    return (value - EPOCH) // timedelta(seconds=1)
+
+
+def _from_epoch(value: int) -> datetime:
+    """ Naive UTC datetime of epoch seconds
+    """
+    if value is None:
+        return None
+    return EPOCH + timedelta(seconds=value)
+
+
+def _encode_cursor(obj_id: str) -> str:
+    """ Opaque continuation token of the page ending with `obj_id`
+    """
+    data = json.dumps({'after': obj_id}).encode()
+    return base64.urlsafe_b64encode(data).decode()
+
+
+def _decode_cursor(cursor: str) -> str:
+    """ Id after which the page of a continuation token starts
+    """
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        after = data['after']
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise ValueError("invalid cursor")
+    if type(after) is not str:
+        raise ValueError("invalid cursor")
+    return after
+
+
+def _iter_json_items(f, chunk_size: int = LOAD_CHUNK_SIZE):
+    """ Incrementally parse a file holding one JSON object of JSON objects,
+    as written by `save_to_file`
+
+    Yields (key, value, value JSON text) for each member, reading the file
+    `chunk_size` characters at a time instead of loading it whole. Keys
+    must be strings and values objects, which both end with a delimiter:
+    a member is never decoded short at the end of a chunk.
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+
+    def skip(pos):
+        while pos < len(buf) and buf[pos].isspace():
+            pos += 1
+        return pos
+
+    def more():
+        nonlocal buf, pos
+        chunk = f.read(chunk_size)
+        buf = buf[pos:] + chunk
+        pos = 0
+        return chunk != ""
+
+    def decode(expected: type):
+        nonlocal pos
+        while True:
+            pos = skip(pos)
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except ValueError:
+                if not more():
+                    raise
+                continue
+            if type(value) is not expected:
+                raise ValueError("expected a JSON {} in JSON object".format(
+                    "string key" if expected is str else "object value"))
+            text = buf[pos:end]
+            pos = end
+            return value, text
+
+    def token():
+        nonlocal pos
+        while True:
+            pos = skip(pos)
+            if pos < len(buf):
+                pos += 1
+                return buf[pos - 1]
+            if not more():
+                raise ValueError("unexpected end of JSON data")
+
+    if token() != '{':
+        raise ValueError("expected a JSON object")
+    pos = skip(pos)
+    while pos >= len(buf) and more():
+        pos = skip(pos)
+    if buf[pos:pos + 1] == '}':
+        return
+    while True:
+        key, _ = decode(str)
+        if token() != ':':
+            raise ValueError("expected ':' in JSON object")
+        value, text = decode(dict)
+        yield key, value, text
+        separator = token()
+        if separator == '}':
+            return
+        if separator != ',':
+            raise ValueError("expected ',' or '}' in JSON object")
+
+
+def flush_all():
+    """ Write the file of every class with pending writes
+
+    Also waits for a write in progress in another thread.
+    """
+    with _write_lock:
+        with _flush_cond:
+            dirty = [cls for cls, _ in DIRTY.values()]
+        for cls in dirty:
+            cls.flush()
+
+
+def _flush_periodically():
+    """ Background flusher of the 'interval' durability mode
+    """
+    while True:
+        with _flush_cond:
+            _flush_cond.wait(min((cls.flush_interval
+                                  for cls, _ in DIRTY.values()),
+                                 default=Base.flush_interval))
+        flush_all()
+
+
+atexit.register(flush_all)
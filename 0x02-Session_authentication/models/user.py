@@ -2,12 +2,15 @@
 """ User module
 """
 import hashlib
-from models.base import Base
+from models.base import CompactBase
 
 
-class User(Base):
+class User(CompactBase):
     """ User class
     """
+    __slots__ = ('email', '_password', 'first_name', 'last_name')
+    indexed_attributes = ('email',)
+    interned_attributes = ('first_name', 'last_name')
 
     def __init__(self, *args: list, **kwargs: dict):
         """ Initialize a User instance